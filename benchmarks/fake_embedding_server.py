@@ -0,0 +1,104 @@
+"""
+Local fake of the OpenAI embeddings endpoint, for exercising batched ingest
+without network access or billing.
+
+    python benchmarks/fake_embedding_server.py --port 8765 --latency-ms 200
+    export OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake
+    python main.py add -p "sample_data/source/"
+
+Vectors are deterministic (seeded by the input text) and every request adds
+a fixed latency, so the number of round-trips dominates wall-clock time just
+like with the real API.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API.
+    latency_s = 0.0
+    default_dimensions = 1536
+    stats = {"requests": 0, "inputs": 0}
+    stats_lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        inputs = payload.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = int(payload.get("dimensions") or self.default_dimensions)
+        as_base64 = payload.get("encoding_format") == "base64"
+
+        time.sleep(self.latency_s)
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats["inputs"] += len(inputs)
+
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_vector(text, dimensions)
+            embedding = (
+                base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+                if as_base64
+                else vector
+            )
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+
+        tokens = sum(max(1, len(text) // 4) for text in inputs)
+        body = json.dumps(
+            {
+                "object": "list",
+                "data": data,
+                "model": payload.get("model", "fake"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        with self.stats_lock:
+            print(f"📨 {self.stats['requests']} requests / {self.stats['inputs']} inputs")
+
+
+def fake_vector(text: str, dimensions: int) -> List[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI embeddings server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    FakeEmbeddingHandler.latency_s = args.latency_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), FakeEmbeddingHandler)
+    print(f"🧪 Fake embedding server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measure document conversion and chunking throughput with a growing number
+of Indexer worker processes (RAG_INDEX_WORKERS).
+
+For every worker count this converts and chunks the whole folder and
+reports the wall time, documents and chunks per second, and the documents
+that failed. Timings include starting the workers and loading their
+models, which is what `python main.py add` pays too. Nothing is embedded
+or written to the datastore.
+
+    python benchmarks/indexing_workers.py --path sample_data/source --workers 1 2 4
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.impl.indexer import Indexer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel document conversion benchmark")
+    parser.add_argument("--path", default="sample_data/source")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.path, "*")))
+    print(f"📄 {len(paths)} documents, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'seconds':>8} {'docs/s':>8} {'chunks/s':>9} {'failed':>7}")
+    for workers in args.workers:
+        indexer = Indexer(workers=workers)
+        start = time.perf_counter()
+        chunks = sum(len(items) for items in indexer.iter_documents(paths))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{workers:>8} {elapsed:>8.2f} {len(paths) / elapsed:>8.2f} "
+            f"{chunks / elapsed:>9.1f} {len(indexer.failures):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
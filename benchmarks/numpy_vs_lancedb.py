@@ -0,0 +1,110 @@
+"""
+Compare the in-memory NumPy datastore with the LanceDB datastore as the
+corpus grows.
+
+For every corpus size this reports the time to open the store, the mean
+vector search latency and the overlap of the NumPy results with LanceDB's
+(both do exact search below `index_min_rows`, so it should be 1.0).
+Chunks are synthetic and embedded locally, so no API calls are made.
+
+    python benchmarks/numpy_vs_lancedb.py --sizes 1000 5000 20000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.impl import Datastore, LocalHashEmbedder, NumpyDatastore
+from src.interface import DataItem
+from src.util.embedding_cache import EmbeddingCache
+
+WORDS = (
+    "ebitda ingresos ventas margen deuda caja dividendos inversiones producción "
+    "petróleo gas cemento energía tarifas resultado neto trimestre emisión clase "
+    "obligaciones negociables capital intereses amortización dólares pesos"
+).split()
+
+
+def synthetic_items(count: int, rng: random.Random):
+    return [
+        DataItem(
+            content=" ".join(rng.choices(WORDS, k=40)) + f" {i}",
+            source=f"synthetic.pdf:{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def open_store(datastore):
+    """Stores open lazily; load the table (or matrix) so "open ms" measures it."""
+    if isinstance(datastore, NumpyDatastore):
+        datastore.vectors, datastore.items
+    else:
+        datastore.table
+    return datastore
+
+
+def timed_searches(datastore, queries, top_k):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append(datastore.search(query, top_k=top_k, mode="vector"))
+    return results, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy vs LanceDB datastore benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    embedder = LocalHashEmbedder(dimensions=args.dimensions)
+    queries = [" ".join(rng.choices(WORDS, k=8)) for _ in range(args.queries)]
+
+    rows = []
+    for size in args.sizes:
+        items = synthetic_items(size, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = EmbeddingCache(os.path.join(tmp, "cache.sqlite"))
+            lance_path = os.path.join(tmp, "lancedb")
+            numpy_path = os.path.join(tmp, "numpy")
+            Datastore(embedder=embedder, embedding_cache=cache, db_path=lance_path).add_items(items)
+            NumpyDatastore(embedder=embedder, embedding_cache=cache, db_path=numpy_path).add_items(items)
+
+            timings = {}
+            for name, factory in (
+                ("lancedb", lambda: Datastore(embedder=embedder, embedding_cache=cache, db_path=lance_path)),
+                ("numpy", lambda: NumpyDatastore(embedder=embedder, embedding_cache=cache, db_path=numpy_path)),
+                ("numpy-mmap", lambda: NumpyDatastore(embedder=embedder, embedding_cache=cache, db_path=numpy_path, mmap=True)),
+            ):
+                start = time.perf_counter()
+                datastore = open_store(factory())
+                open_ms = (time.perf_counter() - start) * 1000
+                for query in queries:
+                    datastore.get_query_vector(query)  # Only measure the search.
+                results, latency_ms = timed_searches(datastore, queries, args.top_k)
+                timings[name] = (open_ms, latency_ms, results)
+
+        baseline = timings["lancedb"][2]
+        for name, (open_ms, latency_ms, results) in timings.items():
+            overlap = sum(
+                len(set(result) & set(expected)) / max(1, len(expected))
+                for result, expected in zip(results, baseline)
+            ) / len(queries)
+            rows.append((size, name, open_ms, latency_ms, overlap))
+
+    print(f"\n{'chunks':>7} {'backend':>11} {'open ms':>9} {'search ms':>10} {'overlap':>8}")
+    for size, name, open_ms, latency_ms, overlap in rows:
+        print(f"{size:>7} {name:>11} {open_ms:>9.2f} {latency_ms:>10.3f} {overlap:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
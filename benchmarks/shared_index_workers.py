@@ -0,0 +1,90 @@
+"""
+Measure what N worker processes cost when they serve the same memory-mapped
+store (see `python main.py export`).
+
+Every worker opens the store with `mmap=True`, runs a few searches and
+reports how long the open took and how much of its memory is private versus
+shared with the other workers (Linux only, from /proc/self/smaps_rollup).
+Vectors and contents should show up as shared: N workers cost about one
+copy of the index.
+
+    python benchmarks/shared_index_workers.py --store data/numpy-store --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def memory_kb() -> dict:
+    stats = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Shared_Clean:", "Private_Clean:", "Private_Dirty:"):
+                stats[parts[0].rstrip(":")] = int(parts[1])
+    return stats
+
+
+def worker(store: str, dimensions: int, queries: int, results) -> None:
+    import numpy as np
+    import pyarrow.compute as pc
+    from src.impl import LocalHashEmbedder, NumpyDatastore
+
+    start = time.perf_counter()
+    datastore = NumpyDatastore(
+        embedder=LocalHashEmbedder(dimensions=dimensions), db_path=store, mmap=True
+    )
+    datastore.items  # The store is loaded on first use.
+    open_ms = (time.perf_counter() - start) * 1000
+
+    # Search with random vectors: this touches every page of the matrix.
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(queries):
+        datastore.vectors @ rng.standard_normal(dimensions).astype(np.float32)
+    pc.sum(pc.utf8_length(datastore.items.column("content")))
+
+    results.put((os.getpid(), open_ms, len(datastore.items), memory_kb()))
+    time.sleep(1)  # Stay alive so the workers overlap.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared memory-mapped store benchmark")
+    parser.add_argument("--store", default="data/numpy-store")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(args.store, args.dimensions, args.queries, results)
+        )
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    store_bytes = sum(
+        os.path.getsize(os.path.join(args.store, name)) for name in os.listdir(args.store)
+    )
+    print(f"\n📦 Store on disk: {store_bytes / 1e6:.1f} MB")
+    print(f"{'pid':>8} {'rows':>8} {'open ms':>8} {'rss MB':>8} {'shared MB':>10} {'private MB':>11}")
+    for pid, open_ms, rows_count, mem in rows:
+        private = mem.get("Private_Clean", 0) + mem.get("Private_Dirty", 0)
+        print(
+            f"{pid:>8} {rows_count:>8} {open_ms:>8.2f} {mem['Rss'] / 1024:>8.1f} "
+            f"{mem.get('Shared_Clean', 0) / 1024:>10.1f} {private / 1024:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
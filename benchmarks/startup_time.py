@@ -0,0 +1,90 @@
+"""
+Guard the CLI startup time: import `main` and build the pipeline the way
+`python main.py query ...` does, in fresh interpreters, and fail if it is
+too slow or if a heavy dependency got imported on the way.
+
+docling, cohere, lancedb and openai must only be imported by the code paths
+that use them (indexing, reranking, the first search, the first API call),
+and the embedding cache must not be created until something is embedded.
+
+    python benchmarks/startup_time.py --runs 5 --budget-ms 1000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED_MODULES = ("docling", "cohere", "lancedb", "openai", "httpx")
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+main.create_pipeline()
+elapsed_ms = (time.perf_counter() - start) * 1000
+loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+print(json.dumps({{"ms": elapsed_ms, "loaded": loaded}}))
+"""
+
+
+def run_once() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        env = {
+            **os.environ,
+            "RAG_EMBEDDING_CACHE_PATH": os.path.join(cache_dir, "embedding-cache.sqlite"),
+        }
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["process_ms"] = (time.perf_counter() - start) * 1000
+        result["cache_created"] = os.path.exists(cache_dir)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    pipeline_ms = statistics.median(r["ms"] for r in results)
+    process_ms = statistics.median(r["process_ms"] for r in results)
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    print(f"⏱️  import main + create_pipeline: {pipeline_ms:.0f} ms (median of {args.runs})")
+    print(f"⏱️  whole process: {process_ms:.0f} ms")
+    print(f"📦 Deferred modules imported at startup: {', '.join(loaded) or 'none'}")
+
+    failed = False
+    if process_ms > args.budget_ms:
+        print(f"❌ Startup is over the {args.budget_ms:.0f} ms budget.")
+        failed = True
+    if loaded:
+        print("❌ Heavy dependencies must be imported lazily.")
+        failed = True
+    if any(r["cache_created"] for r in results):
+        print("❌ create_pipeline opened the embedding cache; open it on first use.")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare embedding dimensions and vector storage dtypes on the sample corpus.
+
+For every setting this reports the table size on disk, the mean search
+latency and recall@k against the full-size float32 baseline, over the
+questions in sample_questions.json. Use it to pick the smallest setting
+that keeps the retrieved context unchanged.
+
+    python benchmarks/vector_settings.py --provider openai --top-k 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import DEFAULT_EVAL_PATH, DEFAULT_SOURCE_PATH, get_files_in_directory
+from src.impl import Datastore, Indexer, create_embedder
+
+# (dimensions, dtype); the first entry is the baseline.
+SETTINGS = [
+    (1536, "float32"),
+    (1536, "float16"),
+    (1024, "float32"),
+    (1024, "float16"),
+    (512, "float32"),
+    (512, "float16"),
+    (256, "float16"),
+]
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector dimensions/dtype benchmark")
+    parser.add_argument("--provider", default=None, help="Embedding provider")
+    parser.add_argument("-p", "--path", default=DEFAULT_SOURCE_PATH)
+    parser.add_argument("-f", "--eval_file", default=DEFAULT_EVAL_PATH)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    items = Indexer().index(get_files_in_directory(args.path))
+    with open(args.eval_file, "r") as file:
+        questions = [item["question"] for item in json.load(file)]
+    print(f"📚 {len(items)} chunks, {len(questions)} questions\n")
+
+    baseline = None
+    rows = []
+    for dimensions, dtype in SETTINGS:
+        with tempfile.TemporaryDirectory() as db_path:
+            datastore = Datastore(
+                embedder=create_embedder(args.provider, dimensions=dimensions),
+                db_path=db_path,
+                vector_dtype=dtype,
+            )
+            datastore.add_items(items)
+            size = directory_size(db_path)
+
+            # Embed the questions up front so latency only measures the search.
+            for question in questions:
+                datastore.get_query_vector(question)
+
+            results = []
+            start = time.perf_counter()
+            for question in questions:
+                # Vector-only: BM25 hits would blur the effect of the vector settings.
+                results.append(datastore.search(question, top_k=args.top_k, mode="vector"))
+            latency_ms = (time.perf_counter() - start) * 1000 / len(questions)
+
+        if baseline is None:
+            baseline = results
+        recall = sum(
+            len(set(result) & set(expected)) / max(1, len(expected))
+            for result, expected in zip(results, baseline)
+        ) / len(questions)
+        rows.append((dimensions, dtype, size, latency_ms, recall))
+
+    print(f"\n{'dims':>6} {'dtype':>8} {'size MB':>9} {'latency ms':>11} {'recall@' + str(args.top_k):>9}")
+    for dimensions, dtype, size, latency_ms, recall in rows:
+        print(
+            f"{dimensions:>6} {dtype:>8} {size / 1e6:>9.2f} {latency_ms:>11.2f} {recall:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -57,10 +57,41 @@ def create_parser():
     subparsers.add_parser(
         "add", help="Add (index) documents to the database.", parents=[path_arg_parent]
     )
+    subparsers.add_parser(
+        "sync",
+        help="Add/update documents and delete the ones no longer in the source directory.",
+        parents=[path_arg_parent],
+    )
     subparsers.add_parser(
         "evaluate", help="Evaluate the model", parents=[eval_file_arg_parent]
     )
 
+    subparsers.add_parser(
+        "index", help="Rebuild the vector index and report the build time."
+    )
+
+    maintain_parser = subparsers.add_parser(
+        "maintain",
+        help="Compact fragments, prune old table versions and refresh the indexes.",
+    )
+    maintain_parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=7,
+        help="Keep table versions newer than this many days (default: 7).",
+    )
+
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export rag-table to a read-only memory-mapped store for worker processes.",
+    )
+    export_parser.add_argument(
+        "--out",
+        type=str,
+        default="data/numpy-store",
+        help="Directory of the exported store (default: data/numpy-store).",
+    )
+
     # "Query" command
     query_parser = subparsers.add_parser("query", help="Query the documents")
     query_parser.add_argument("prompt", type=str, help="What to search for.")
@@ -4,9 +4,21 @@ import os
 from typing import List
 from src.rag_pipeline import RAGPipeline
 from create_parser import create_parser
+from src.util.clients import connection_stats
+from src.impl.numpy_datastore import export_from_lancedb
+from src.util.dedup import NearDuplicateFilter
 from dotenv import load_dotenv
 import os
-from src.impl import Datastore, Indexer, Retriever, ResponseGenerator, Evaluator
+from src.impl import (
+    Datastore,
+    Indexer,
+    NumpyDatastore,
+    PartitionedDatastore,
+    Retriever,
+    ResponseGenerator,
+    Evaluator,
+    create_embedder,
+)
 
 
 DEFAULT_SOURCE_PATH = "sample_data/source/"
@@ -15,12 +27,35 @@ DEFAULT_EVAL_PATH = "sample_data/eval/sample_questions.json"
 
 def create_pipeline() -> RAGPipeline:
     """Create and return a new RAG Pipeline instance with all components."""
-    datastore = Datastore()
+    embedder = create_embedder()  # RAG_EMBEDDING_PROVIDER: "openai" (default) or "local"
     indexer = Indexer()
+    # Embedding batches are packed by token count, using the chunker's tokenizer.
+    count_tokens = indexer.count_tokens
+    if os.getenv("RAG_DATASTORE") == "numpy":
+        # Exact in-memory search, for small corpora.
+        # RAG_NUMPY_MMAP=1 maps the store read-only, shared by all worker processes.
+        datastore = NumpyDatastore(
+            embedder=embedder,
+            mmap=os.getenv("RAG_NUMPY_MMAP", "0") == "1",
+            count_tokens=count_tokens,
+        )
+    elif os.getenv("RAG_PARTITION_BY"):
+        # One table per issuer ("issuer") or per year ("year").
+        datastore = PartitionedDatastore(embedder=embedder, count_tokens=count_tokens)
+    else:
+        datastore = Datastore(embedder=embedder, count_tokens=count_tokens)
     retriever = Retriever(datastore=datastore)
     response_generator = ResponseGenerator()
-    evaluator = Evaluator()
-    return RAGPipeline(datastore, indexer, retriever, response_generator, evaluator)
+    evaluator = Evaluator(embedder=embedder)
+    # Opt-in: repeated boilerplate across reports is embedded and stored only once.
+    deduplicator = None
+    if os.getenv("RAG_DEDUP", "0") == "1":
+        deduplicator = NearDuplicateFilter(
+            threshold=float(os.getenv("RAG_DEDUP_THRESHOLD", "0.9"))
+        )
+    return RAGPipeline(
+        datastore, indexer, retriever, response_generator, evaluator, deduplicator
+    )
 
 
 def main():
@@ -42,15 +77,42 @@ def main():
         print(f"🔍 Adding documents: {', '.join(document_paths)}")
         pipeline.add_documents(document_paths)
 
+    if args.command == "sync":
+        if not document_paths:
+            print(f"❌ No documents found in {source_path}; nothing was synced.")
+        else:
+            print(f"🔄 Syncing the datastore with: {source_path}")
+            pipeline.add_documents(document_paths, remove_missing=True)
+
     if args.command in ["evaluate", "run"]:
         print(f"📊 Evaluating using questions from: {eval_path}")
         with open(eval_path, "r") as file:
             sample_questions = json.load(file)
         pipeline.evaluate(sample_questions)
 
+    if args.command == "index":
+        print("⚡ Rebuilding the vector index...")
+        elapsed = pipeline.rebuild_index()
+        if elapsed is not None:
+            print(f"✅ Index rebuilt in {elapsed:.2f}s")
+
+    if args.command == "maintain":
+        print(f"🧹 Compacting the datastore (retention: {args.retention_days} days)...")
+        pipeline.maintain(retention_days=args.retention_days)
+
+    if args.command == "export":
+        if not isinstance(pipeline.datastore, Datastore):
+            print("⚠️ Export reads from the LanceDB datastore; unset RAG_DATASTORE/RAG_PARTITION_BY.")
+        else:
+            export_from_lancedb(pipeline.datastore, args.out)
+
     if args.command == "query":
         print(f"✨ Response: {pipeline.process_query(args.prompt)}")
 
+    stats = connection_stats()
+    if stats["requests"]:
+        print(f"🔌 OpenAI connections: {stats}")
+
 
 def get_files_in_directory(source_path: str) -> List[str]:
     if os.path.isfile(source_path):
@@ -1,13 +1,23 @@
+from .async_datastore import AsyncDatastore
 from .datastore import Datastore
+from .embedder import LocalHashEmbedder, OpenAIEmbedder, create_embedder
 from .evaluator import Evaluator
 from .indexer import Indexer
+from .numpy_datastore import NumpyDatastore
+from .partitioned_datastore import PartitionedDatastore
 from .response_generator import ResponseGenerator
 from .retriever import Retriever
 
 __all__ = [
+    "AsyncDatastore",
     "Datastore",
+    "LocalHashEmbedder",
+    "OpenAIEmbedder",
+    "create_embedder",
     "Evaluator",
     "Indexer",
+    "NumpyDatastore",
+    "PartitionedDatastore",
     "ResponseGenerator",
     "Retriever",
 ]
\ No newline at end of file
@@ -0,0 +1,182 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from src.interface.base_async_datastore import BaseAsyncDatastore
+from src.interface.base_datastore import DataItem
+from src.interface.base_embedder import BaseEmbedder
+from src.impl.datastore import (
+    Datastore,
+    check_table_schema,
+    content_hash,
+    embedding_metadata,
+    item_to_entry,
+    migrated_message,
+    rag_table_schema,
+    unrecorded_model_message,
+)
+from src.impl.embedder import create_embedder
+from src.util.batching import MAX_INPUT_TOKENS
+from src.util.embedding_cache import EmbeddingCache
+from src.util.embedding_mixin import EmbeddingMixin
+from src.util.sql import sql_filter, sql_in
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    from lancedb.table import AsyncTable
+
+
+class AsyncDatastore(EmbeddingMixin, BaseAsyncDatastore):
+    """
+    Async datastore over the same LanceDB table as `Datastore`, built on
+    `lancedb.connect_async` and the embedder's async client. A single event
+    loop can drive many concurrent searches and embedding batches.
+    Index management stays in the sync `Datastore`.
+    """
+
+    DB_PATH = Datastore.DB_PATH
+    DB_TABLE_NAME = Datastore.DB_TABLE_NAME
+    DISTANCE_TYPE = Datastore.DISTANCE_TYPE
+
+    def __init__(
+        self,
+        embedder: Optional[BaseEmbedder] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        db_path: Optional[str] = None,
+        vector_dtype: Optional[str] = None,
+        embedding_batch_size: int = 256,
+        embedding_batch_max_tokens: int = 100_000,
+        embedding_max_input_tokens: int = MAX_INPUT_TOKENS,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        embedding_oversize: str = "split",
+        max_inflight_batches: int = 16,
+        nprobes: int = 20,
+        refine_factor: Optional[int] = None,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 24 * 3600,
+    ):
+        self._init_embeddings(
+            embedder or create_embedder(),
+            embedding_cache=embedding_cache,
+            query_cache_size=query_cache_size,
+            query_cache_ttl=query_cache_ttl,
+            embedding_batch_size=embedding_batch_size,
+            embedding_batch_max_tokens=embedding_batch_max_tokens,
+            embedding_max_input_tokens=embedding_max_input_tokens,
+            count_tokens=count_tokens,
+            embedding_oversize=embedding_oversize,
+            max_inflight_batches=max_inflight_batches,
+        )
+        self.vector_dtype = vector_dtype or os.getenv("RAG_VECTOR_DTYPE", "float32")
+        self.db_path = db_path or self.DB_PATH
+        self.nprobes = nprobes
+        self.refine_factor = refine_factor
+        self._table: Optional["AsyncTable"] = None
+        self._table_lock = asyncio.Lock()
+
+    async def get_table(self) -> "AsyncTable":
+        """
+        Connect and open (or create) the table on first use. An existing table
+        goes through the same checks and migration as in `Datastore`.
+        """
+        if self._table is None:
+            async with self._table_lock:
+                if self._table is None:
+                    import lancedb
+
+                    db = await lancedb.connect_async(self.db_path)
+                    if self.DB_TABLE_NAME in await db.table_names():
+                        table = await db.open_table(self.DB_TABLE_NAME)
+                        await self._check_table(table)
+                        self._table = table
+                    else:
+                        self._table = await db.create_table(
+                            self.DB_TABLE_NAME,
+                            schema=rag_table_schema(
+                                self.vector_dimensions,
+                                self.vector_dtype,
+                                self.embedder.model_name,
+                            ),
+                        )
+        return self._table
+
+    async def _check_table(self, table: "AsyncTable") -> None:
+        missing, unrecorded = check_table_schema(
+            await table.schema(),
+            self.vector_dimensions,
+            self.vector_dtype,
+            self.embedder.model_name,
+            self.DB_TABLE_NAME,
+        )
+        if missing:
+            await table.add_columns(pa.schema(missing))
+            print(migrated_message(self.DB_TABLE_NAME, missing))
+        if unrecorded:
+            await table.replace_field_metadata(
+                "vector", embedding_metadata(self.embedder.model_name, self.vector_dimensions)
+            )
+            if await table.count_rows():
+                print(unrecorded_model_message(self.DB_TABLE_NAME, self.embedder.model_name))
+
+    async def aadd_items(self, items: List[DataItem]) -> None:
+        total = len(items)
+        items = await self._changed_items(items)
+        print(f"♻️  {total - len(items)}/{total} items unchanged, skipping re-embedding.")
+        if not items:
+            return
+
+        vectors = await self.aget_vectors([item.content for item in items])
+        entries = [item_to_entry(item, vector) for item, vector in zip(items, vectors)]
+
+        table = await self.get_table()
+        await table.merge_insert(
+            "source"
+        ).when_matched_update_all().when_not_matched_insert_all().execute(entries)
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> List[str]:
+        vector = await self.aget_query_vector(query)
+        table = await self.get_table()
+        search = (
+            table.query()
+            .nearest_to(vector)
+            .distance_type(self.DISTANCE_TYPE)
+            .select(["content", "source"])
+            .limit(top_k)
+            .nprobes(nprobes or self.nprobes)
+        )
+        refine_factor = refine_factor or self.refine_factor
+        if refine_factor:
+            search = search.refine_factor(refine_factor)
+        where = sql_filter(filters)
+        if where:
+            search = search.where(where)
+        results = await search.to_list()
+        return [result.get("content") for result in results]
+
+    async def _changed_items(self, items: List[DataItem]) -> List[DataItem]:
+        """Keep only items whose (source, content_hash) is not already stored."""
+        if not items:
+            return items
+        existing = await self._existing_hashes([item.source for item in items])
+        return [
+            item
+            for item in items
+            if existing.get(item.source) != content_hash(item.content)
+        ]
+
+    async def _existing_hashes(self, sources: List[str]) -> Dict[str, str]:
+        table = await self.get_table()
+        rows = (
+            await table.query()
+            .where(sql_in("source", sources))
+            .select(["source", "content_hash"])
+            .limit(len(sources))
+            .to_arrow()
+        ).to_pydict()
+        return dict(zip(rows["source"], rows["content_hash"]))
@@ -1,87 +1,713 @@
-from typing import List
-from src.interface.base_datastore import BaseDatastore, DataItem
-import lancedb
-from lancedb.table import Table
+import hashlib
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.interface.base_datastore import (
+    BaseDatastore,
+    DataItem,
+    SearchResults,
+    stale_documents,
+)
+from src.interface.base_embedder import BaseEmbedder
+from src.impl.embedder import create_embedder
+from src.util.batching import MAX_INPUT_TOKENS
+from src.util.embedding_cache import EmbeddingCache
+from src.util.embedding_mixin import EmbeddingMixin
+from src.util.lru_cache import LRUCache
+from src.util.rank_fusion import reciprocal_rank_fusion
+from src.util.sql import sql_filter, sql_in, sql_prefix
 import pyarrow as pa
-from openai import OpenAI
+import pyarrow.compute as pc
 from concurrent.futures import ThreadPoolExecutor
 
+if TYPE_CHECKING:
+    from lancedb.table import Table
 
-class Datastore(BaseDatastore):
+
+VECTOR_DTYPES = {"float32": pa.float32(), "float16": pa.float16()}
+
+
+def rag_table_schema(
+    vector_dimensions: int,
+    vector_dtype: str = "float32",
+    embedding_model: Optional[str] = None,
+) -> pa.Schema:
+    """
+    Schema of the `rag-table`, shared by the sync and async datastores.
+    `float16` halves the size of the stored vectors. The embedding model is
+    recorded in the metadata of the vector field.
+    """
+    if vector_dtype not in VECTOR_DTYPES:
+        raise ValueError(
+            f"Unknown vector dtype '{vector_dtype}'. Choose one of: {', '.join(VECTOR_DTYPES)}"
+        )
+    return pa.schema(
+        [
+            pa.field(
+                "vector",
+                pa.list_(VECTOR_DTYPES[vector_dtype], vector_dimensions),
+                metadata=embedding_metadata(embedding_model, vector_dimensions),
+            ),
+            pa.field("content", pa.utf8()),
+            pa.field("source", pa.utf8()),
+            pa.field("content_hash", pa.utf8()),
+            pa.field("issuer", pa.utf8()),
+            pa.field("period", pa.utf8()),
+            pa.field("doc_type", pa.utf8()),
+            pa.field("page", pa.int32()),
+        ]
+    )
+
+
+def embedding_metadata(
+    embedding_model: Optional[str], vector_dimensions: int
+) -> Optional[Dict[str, str]]:
+    if embedding_model is None:
+        return None
+    return {"embedding_model": embedding_model, "dimensions": str(vector_dimensions)}
+
+
+def check_embedding_model(
+    vector_field: pa.Field, embedding_model: str, table_name: str
+) -> Optional[str]:
+    """
+    Raise if the vectors of a table were produced by another embedding model.
+    Returns the stored model name (None for tables that predate the record).
+    """
+    stored = (vector_field.metadata or {}).get(b"embedding_model")
+    if stored is None:
+        return None
+    stored = stored.decode("utf-8")
+    if stored != embedding_model:
+        # Queries embedded by another model would be compared with these vectors.
+        raise ValueError(
+            f"Table '{table_name}' holds vectors from '{stored}', but the embedder is "
+            f"'{embedding_model}' (RAG_EMBEDDING_PROVIDER). Use the same embedder, or "
+            "run `python main.py reset` and `add` to re-embed the corpus."
+        )
+    return stored
+
+
+def check_table_schema(
+    schema: pa.Schema,
+    vector_dimensions: int,
+    vector_dtype: str,
+    embedding_model: str,
+    table_name: str,
+) -> Tuple[List[pa.Field], bool]:
+    """
+    Check an existing table against the datastore settings before using it.
+    Raises on unknown columns, on other vector dimensions or dtype, and on
+    another embedding model: never rebuild implicitly, a forgotten env var
+    must not wipe the store. Returns the columns an older table is missing
+    (added empty, so no rows are lost) and whether the table has yet to
+    record its embedding model.
+    """
+    expected = rag_table_schema(vector_dimensions, vector_dtype)
+    unknown = [name for name in schema.names if name not in expected.names]
+    if unknown:
+        raise ValueError(
+            f"Table '{table_name}' has unexpected columns {unknown}. "
+            "Run `python main.py reset` to rebuild it."
+        )
+
+    stored = schema.field("vector").type
+    if stored != expected.field("vector").type:
+        stored_dtype = next(
+            (name for name, dtype in VECTOR_DTYPES.items() if dtype == stored.value_type),
+            str(stored.value_type),
+        )
+        raise ValueError(
+            f"Table '{table_name}' stores {stored.list_size}-dim {stored_dtype} "
+            f"vectors, but the datastore is set to {vector_dimensions}-dim "
+            f"{vector_dtype} (RAG_EMBEDDING_DIMENSIONS / RAG_VECTOR_DTYPE). "
+            "Use the same settings, or run `python main.py reset` to rebuild it."
+        )
+    unrecorded = check_embedding_model(schema.field("vector"), embedding_model, table_name) is None
+
+    # Rows without a content hash are simply upserted again on the next add
+    # (from the embedding cache).
+    missing = [field for field in expected if field.name not in schema.names]
+    return missing, unrecorded
+
+
+def migrated_message(table_name: str, missing: List[pa.Field]) -> str:
+    return f"🔧 Migrated {table_name}: added columns {', '.join(field.name for field in missing)}."
+
+
+def unrecorded_model_message(table_name: str, embedding_model: str) -> str:
+    return (
+        f"⚠️ {table_name} didn't record its embedding model; assuming "
+        f"'{embedding_model}'. Run `reset` and `add` if it was another one."
+    )
+
+
+# Metadata columns with a scalar index, usable as search prefilters.
+SCALAR_INDEXES = {
+    "issuer": "BITMAP",
+    "period": "BITMAP",
+    "doc_type": "BITMAP",
+    "page": "BTREE",
+}
+
+
+def item_to_entry(item: DataItem, vector: List[float]) -> dict:
+    """Convert a DataItem and its vector to a `rag-table` row."""
+    return {
+        "vector": vector,
+        "content": item.content,
+        "source": item.source,
+        "content_hash": content_hash(item.content),
+        "issuer": item.issuer,
+        "period": item.period,
+        "doc_type": item.doc_type,
+        "page": item.page,
+    }
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class Datastore(EmbeddingMixin, BaseDatastore):
 
     DB_PATH = "data/sample-lancedb"
     DB_TABLE_NAME = "rag-table"
 
-    def __init__(self):
-        self.vector_dimensions = 1536
-        self.open_ai_client = OpenAI()
-        self.vector_db = lancedb.connect(self.DB_PATH)
-        self.table: Table = self._get_table()
+    DISTANCE_TYPE = "cosine"
+    SEARCH_MODES = ("vector", "hybrid")
+
+    def __init__(
+        self,
+        embedder: Optional[BaseEmbedder] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        db_path: Optional[str] = None,
+        table_name: Optional[str] = None,
+        vector_dtype: Optional[str] = None,
+        embedding_batch_size: int = 256,
+        embedding_batch_max_tokens: int = 100_000,
+        embedding_max_input_tokens: int = MAX_INPUT_TOKENS,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        embedding_oversize: str = "split",
+        max_inflight_batches: int = 4,
+        index_type: str = "IVF_PQ",
+        index_min_rows: int = 10_000,
+        index_rebuild_ratio: float = 0.2,
+        nprobes: int = 20,
+        refine_factor: Optional[int] = None,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 24 * 3600,
+        query_cache: Optional[LRUCache] = None,
+        search_mode: Optional[str] = None,
+        hybrid_candidate_multiplier: int = 2,
+    ):
+        self._init_embeddings(
+            embedder or create_embedder(),
+            embedding_cache=embedding_cache,
+            query_cache=query_cache,
+            query_cache_size=query_cache_size,
+            query_cache_ttl=query_cache_ttl,
+            embedding_batch_size=embedding_batch_size,
+            embedding_batch_max_tokens=embedding_batch_max_tokens,
+            embedding_max_input_tokens=embedding_max_input_tokens,
+            count_tokens=count_tokens,
+            embedding_oversize=embedding_oversize,
+            max_inflight_batches=max_inflight_batches,
+        )
+        self.vector_dtype = vector_dtype or os.getenv("RAG_VECTOR_DTYPE", "float32")
+        self.db_path = db_path or self.DB_PATH
+        self.table_name = table_name or self.DB_TABLE_NAME
+        # ANN index settings ("IVF_PQ" or "IVF_HNSW_SQ"). Below `index_min_rows`
+        # a flat scan is fast enough and the index is not built.
+        self.index_type = index_type
+        self.index_min_rows = index_min_rows
+        self.index_rebuild_ratio = index_rebuild_ratio
+        self.nprobes = nprobes
+        self.refine_factor = refine_factor
+        # "hybrid" fuses full-text (BM25) and vector results, which catches exact
+        # tokens like "ON Clase XXXV" that dense vectors tend to miss.
+        self.search_mode = search_mode or os.getenv("RAG_SEARCH_MODE", "hybrid")
+        if self.search_mode not in self.SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode '{self.search_mode}'. "
+                f"Choose one of: {', '.join(self.SEARCH_MODES)}"
+            )
+        self.hybrid_candidate_multiplier = hybrid_candidate_multiplier
+        # LanceDB is connected and the table opened on first use, so commands
+        # that never touch the store (or only query it) start fast.
+        self._vector_db = None
+        self._table: Optional["Table"] = None
+        self._table_lock = threading.RLock()
+
+    @property
+    def vector_db(self):
+        with self._table_lock:
+            if self._vector_db is None:
+                import lancedb
+
+                self._vector_db = lancedb.connect(self.db_path)
+            return self._vector_db
 
-    def reset(self) -> Table:
+    @property
+    def table(self) -> "Table":
+        with self._table_lock:
+            if self._table is None:
+                self._table = self._get_table()
+            return self._table
+
+    def reset(self) -> "Table":
         # Drop the table if it exists
         try:
-            self.vector_db.drop_table(self.DB_TABLE_NAME)
+            self.vector_db.drop_table(self.table_name)
         except Exception as e:
             print("Unable to drop table. Assuming it doesn't exist.")
 
         # Create the new table.
-        schema = pa.schema(
-            [
-                pa.field("vector", pa.list_(pa.float32(), self.vector_dimensions)),
-                pa.field("content", pa.utf8()),
-                pa.field("source", pa.utf8()),
-            ]
+        schema = rag_table_schema(
+            self.vector_dimensions, self.vector_dtype, self.embedder.model_name
         )
+        self.vector_db.create_table(self.table_name, schema=schema)
+        with self._table_lock:
+            self._table = self.vector_db.open_table(self.table_name)
+        print(f"✅ Table Reset/Created: {self.table_name} in {self.db_path}")
+        return self._table
 
-        self.vector_db.create_table(self.DB_TABLE_NAME, schema=schema)
-        self.table = self.vector_db.open_table(self.DB_TABLE_NAME)
-        print(f"✅ Table Reset/Created: {self.DB_TABLE_NAME} in {self.DB_PATH}")
-        return self.table
-
-    def get_vector(self, content: str) -> List[float]:
-        response = self.open_ai_client.embeddings.create(
-            input=content,
-            model="text-embedding-3-small",
-            dimensions=self.vector_dimensions,
-        )
-        embeddings = response.data[0].embedding
-        return embeddings
+    def add_items(self, items: List[DataItem], update_indexes: bool = True) -> None:
+        total = len(items)
+        items = self._changed_items(items)
+        print(f"♻️  {total - len(items)}/{total} items unchanged, skipping re-embedding.")
+        if not items:
+            return
 
-    def add_items(self, items: List[DataItem]) -> None:
-
-        # Convert items to entries in parallel (since it's network bound).
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            entries = list(executor.map(self._convert_item_to_entry, items))
+        vectors = self.get_vectors([item.content for item in items])
+        entries = [
+            self._convert_item_to_entry(item, vector)
+            for item, vector in zip(items, vectors)
+        ]
 
         self.table.merge_insert(
             "source"
         ).when_matched_update_all().when_not_matched_insert_all().execute(entries)
+        print(f"🧠 Embedding cache: {self.embedding_cache.stats()}")
+        if update_indexes:
+            self.update_indexes()
 
-    def search(self, query: str, top_k: int = 5) -> List[str]:
-        vector = self.get_vector(query)
-        results = (
-            self.table.search(vector)
-            .select(["content", "source"])
-            .limit(top_k)
-            .to_list()
+    def sync_documents(
+        self,
+        sources_by_document: Dict[str, Iterable[str]],
+        keep_documents: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Delete chunks that no longer exist, with one bulk predicate delete per
+        affected document (no reset or re-embedding needed).
+        """
+        rows = self.table.count_rows()
+        stored = self.table.search().select(["source"]).limit(max(1, rows)).to_arrow()
+        stale = stale_documents(
+            stored.column("source").to_pylist(), sources_by_document, keep_documents
+        )
+        for document, keep in stale.items():
+            predicate = sql_prefix("source", f"{document}:")
+            if keep:
+                predicate += f" AND NOT ({sql_in('source', sorted(keep))})"
+            self.table.delete(predicate)
+
+        deleted = rows - self.table.count_rows()
+        if deleted:
+            print(f"🧽 Deleted {deleted} stale rows from {len(stale)} document(s).")
+        return deleted
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> List[str]:
+        results = self.search_results(
+            query, top_k, filters, mode, nprobes=nprobes, refine_factor=refine_factor
+        )
+        return results.contents()
+
+    def search_results(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> SearchResults:
+        """
+        Search the table and return Arrow-backed results with content, source,
+        distance and score. `filters` (e.g. {"issuer": "YPF", "period": "3Q25"})
+        are pushed down as prefilters, so only that slice is scanned.
+        """
+        where = sql_filter(filters)
+        if (mode or self.search_mode) == "hybrid":
+            return self._hybrid_search(query, top_k, where, nprobes, refine_factor)
+
+        hits = self._vector_search(query, top_k, where, nprobes, refine_factor)
+        return self._vector_results(hits)
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Any] = None,
+        mode: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> List[SearchResults]:
+        """
+        Search many queries at once. All queries are embedded in one batched call.
+        In vector mode, queries sharing the same filters run as a single
+        multi-vector scan; hybrid searches run concurrently. `filters` is either
+        one dict for every query or a list with one entry per query.
+        """
+        if not queries:
+            return []
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * len(queries)
+        vectors = self.get_query_vectors(queries)
+
+        if (mode or self.search_mode) == "hybrid":
+            with ThreadPoolExecutor(max_workers=self.max_inflight_batches) as executor:
+                return list(
+                    executor.map(
+                        lambda query, query_filters: self._hybrid_search(
+                            query, top_k, sql_filter(query_filters), nprobes, refine_factor
+                        ),
+                        queries,
+                        filters,
+                    )
+                )
+
+        # Group queries by their filters: one multi-vector scan per group.
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, query_filters in enumerate(filters):
+            groups.setdefault(sql_filter(query_filters), []).append(i)
+
+        results: List[Optional[SearchResults]] = [None] * len(queries)
+        for where, indices in groups.items():
+            hits = self._vector_search_many(
+                [vectors[i] for i in indices], top_k, where, nprobes, refine_factor
+            )
+            if len(indices) == 1:
+                results[indices[0]] = self._vector_results(hits)
+                continue
+            for position, i in enumerate(indices):
+                query_hits = hits.filter(pc.equal(hits["query_index"], position))
+                results[i] = self._vector_results(query_hits)
+        return results
+
+    @staticmethod
+    def _vector_results(hits: pa.Table) -> SearchResults:
+        return SearchResults.from_columns(
+            hits["content"],
+            hits["source"],
+            distances=hits["_distance"],
+            # Cosine distance -> similarity, so higher is better in every mode.
+            scores=pc.subtract(1.0, hits["_distance"]),
         )
 
-        result_content = [result.get("content") for result in results]
-        return result_content
+    def _vector_search(
+        self,
+        query: str,
+        limit: int,
+        where: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> pa.Table:
+        vector = self.get_query_vector(query)
+        return self._vector_search_many([vector], limit, where, nprobes, refine_factor)
 
-    def _get_table(self) -> Table:
+    def _vector_search_many(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        where: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> pa.Table:
+        """Nearest neighbours of several vectors in one scan (`limit` rows per vector, tagged by `query_index`)."""
+        search = (
+            self.table.search(vectors if len(vectors) > 1 else vectors[0])
+            .distance_type(self.DISTANCE_TYPE)
+            .select(["content", "source"])
+            .limit(limit)
+            .nprobes(nprobes or self.nprobes)
+        )
+        if where:
+            search = search.where(where, prefilter=True)
+        refine_factor = refine_factor or self.refine_factor
+        if refine_factor:
+            search = search.refine_factor(refine_factor)
+        return search.to_arrow()
+
+    def _text_search(
+        self, query: str, limit: int, where: Optional[str] = None
+    ) -> Optional[pa.Table]:
         try:
-            return self.vector_db.open_table(self.DB_TABLE_NAME)
+            search = (
+                self.table.search(query, query_type="fts", fts_columns="content")
+                .select(["content", "source"])
+                .limit(limit)
+            )
+            if where:
+                search = search.where(where, prefilter=True)
+            return search.to_arrow()
         except Exception as e:
-            print(f"Error opening table. Try resetting the datastore: {e}")
-            return self.reset()
+            # No full-text index yet (e.g. empty table): fall back to vectors only.
+            print(f"⚠️ Full-text search unavailable, using vector search only: {e}")
+            return None
+
+    def _hybrid_search(
+        self,
+        query: str,
+        top_k: int,
+        where: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> SearchResults:
+        """Run vector and full-text search and merge them with reciprocal-rank fusion."""
+        vector_hits, text_hits = self.hybrid_candidates(
+            query, top_k, where, nprobes, refine_factor
+        )
+        return self.fuse_candidates(vector_hits, text_hits, top_k)
+
+    def hybrid_candidates(
+        self,
+        query: str,
+        top_k: int,
+        where: Optional[str] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+    ) -> Tuple[pa.Table, Optional[pa.Table]]:
+        """
+        The vector hits (with `_distance`) and full-text hits (with `_score`,
+        None without an FTS index) that hybrid search fuses. Exposed so
+        several tables can pool their candidates and fuse them only once.
+        """
+        limit = top_k * self.hybrid_candidate_multiplier
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vector_future = executor.submit(
+                self._vector_search, query, limit, where, nprobes, refine_factor
+            )
+            text_future = executor.submit(self._text_search, query, limit, where)
+            return vector_future.result(), text_future.result()
+
+    @staticmethod
+    def fuse_candidates(
+        vector_hits: pa.Table, text_hits: Optional[pa.Table], top_k: int
+    ) -> SearchResults:
+        """Reciprocal-rank fusion of vector hits (best first) and full-text hits (best first)."""
+        candidates = [vector_hits.select(["content", "source"])]
+        if text_hits is not None:
+            candidates.append(text_hits.select(["content", "source"]))
+        candidates = pa.concat_tables(candidates)
+
+        # Only the sources are materialised; contents stay in Arrow.
+        sources = candidates.column("source").to_pylist()
+        vector_sources = sources[: vector_hits.num_rows]
+        fused = reciprocal_rank_fusion([vector_sources, sources[vector_hits.num_rows :]])
+        fused = fused[:top_k]
+
+        first_row = {}
+        for row, source in enumerate(sources):
+            first_row.setdefault(source, row)
+        distance_by_source = dict(
+            zip(vector_sources, vector_hits.column("_distance").to_pylist())
+        )
+
+        rows = candidates.take(
+            pa.array([first_row[source] for source, _ in fused], type=pa.int64())
+        )
+        return SearchResults.from_columns(
+            rows.column("content"),
+            rows.column("source"),
+            distances=[distance_by_source.get(source) for source, _ in fused],
+            scores=[score for _, score in fused],
+        )
+
+    def build_index(self, force: bool = False) -> Optional[float]:
+        """
+        Build (or rebuild) the ANN vector index.
+        Returns the build time in seconds, or None if the index was not built.
+        """
+        rows = self.table.count_rows()
+        if not force and rows < self.index_min_rows:
+            return None
+        if rows < 256:
+            # IVF training needs at least a few hundred vectors.
+            print(f"⚠️ Only {rows} rows, not enough to train a vector index.")
+            return None
+
+        index_params = {
+            "metric": self.DISTANCE_TYPE,
+            "vector_column_name": "vector",
+            "index_type": self.index_type,
+            "num_partitions": max(1, int(rows**0.5)),
+            "replace": True,
+        }
+        if self.index_type == "IVF_PQ":
+            index_params["num_sub_vectors"] = self._num_sub_vectors()
+
+        start = time.perf_counter()
+        self.table.create_index(**index_params)
+        elapsed = time.perf_counter() - start
+        print(f"⚡ Built {self.index_type} index on {rows} rows in {elapsed:.2f}s")
+        return elapsed
+
+    def build_fts_index(self) -> None:
+        """(Re)build the full-text index on `content` used by hybrid search."""
+        self.table.create_fts_index(
+            "content",
+            use_tantivy=False,
+            language="Spanish",
+            ascii_folding=True,
+            replace=True,
+        )
+
+    def maintain(self, retention: timedelta = timedelta(days=7)) -> Dict[str, Any]:
+        """
+        Compact the small fragments left behind by every upsert, prune table
+        versions older than `retention` and refresh the indexes.
+        Returns before/after storage stats.
+        """
+        before = self.storage_stats()
+        start = time.perf_counter()
+        # optimize() = compaction + cleanup of old versions + incremental index update.
+        self.table.optimize(cleanup_older_than=retention, delete_unverified=False)
+        self.update_indexes()
+        elapsed = time.perf_counter() - start
+        after = self.storage_stats()
+        print(f"🧹 Maintenance finished in {elapsed:.2f}s")
+        return {"before": before, "after": after, "seconds": elapsed}
+
+    def storage_stats(self, scan_repeats: int = 3) -> Dict[str, Any]:
+        """
+        Files and bytes on disk, versions and full-scan latency of the table.
+        `files_on_disk` also counts files that only older versions (still
+        inside the retention window) reference, so it drops after `maintain`.
+        """
+        table_path = os.path.join(self.db_path, f"{self.table_name}.lance")
+        data_path = os.path.join(table_path, "data")
+        files_on_disk = (
+            sum(1 for name in os.listdir(data_path) if name.endswith(".lance"))
+            if os.path.isdir(data_path)
+            else 0
+        )
+        bytes_on_disk = 0
+        for root, _, files in os.walk(table_path):
+            bytes_on_disk += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+
+        rows = self.table.count_rows()
+        start = time.perf_counter()
+        for _ in range(scan_repeats):
+            self.table.search().select(["source", "content"]).limit(max(1, rows)).to_arrow()
+        scan_ms = (time.perf_counter() - start) * 1000 / scan_repeats
 
-    def _convert_item_to_entry(self, item: DataItem) -> dict:
-        """Convert a DataItem to match table schema."""
-        vector = self.get_vector(item.content)
         return {
-            "vector": vector,
-            "content": item.content,
-            "source": item.source,
-        }
\ No newline at end of file
+            "rows": rows,
+            "files_on_disk": files_on_disk,
+            "rows_per_file": round(rows / files_on_disk) if files_on_disk else 0,
+            "versions": len(self.table.list_versions()),
+            "bytes": bytes_on_disk,
+            "scan_ms": round(scan_ms, 2),
+        }
+
+    def update_indexes(self) -> None:
+        """
+        Build the indexes once the table is big enough, and rebuild them when too
+        many rows are unindexed (unindexed rows are still searched, just slower).
+        """
+        vector_index = self._index_name("vector")
+        if vector_index is None:
+            self.build_index()
+        elif self._needs_rebuild(vector_index):
+            self.build_index(force=True)
+
+        fts_index = self._index_name("content")
+        if fts_index is None or self._needs_rebuild(fts_index):
+            self.build_fts_index()
+
+        for column, index_type in SCALAR_INDEXES.items():
+            scalar_index = self._index_name(column)
+            if scalar_index is None or self._needs_rebuild(scalar_index):
+                self.table.create_scalar_index(column, index_type=index_type, replace=True)
+
+    def _needs_rebuild(self, index_name: str) -> bool:
+        stats = self.table.index_stats(index_name)
+        indexed = max(1, stats.num_indexed_rows)
+        return stats.num_unindexed_rows / indexed >= self.index_rebuild_ratio
+
+    def _index_name(self, column: str) -> Optional[str]:
+        for index in self.table.list_indices():
+            if column in index.columns:
+                return index.name
+        return None
+
+    def _num_sub_vectors(self) -> int:
+        """PQ requires the dimensions to be divisible by the number of sub-vectors."""
+        for sub_vector_dim in (16, 8):
+            if self.vector_dimensions % sub_vector_dim == 0:
+                return self.vector_dimensions // sub_vector_dim
+        return 1
+
+    def _get_table(self) -> "Table":
+        if self.table_name not in self.vector_db.table_names(limit=10_000):
+            return self.reset()
+        table = self.vector_db.open_table(self.table_name)
+        missing, unrecorded = check_table_schema(
+            table.schema,
+            self.vector_dimensions,
+            self.vector_dtype,
+            self.embedder.model_name,
+            self.table_name,
+        )
+        if missing:
+            table.add_columns(pa.schema(missing))
+            print(migrated_message(self.table_name, missing))
+        if unrecorded:
+            table.replace_field_metadata(
+                "vector", embedding_metadata(self.embedder.model_name, self.vector_dimensions)
+            )
+            if table.count_rows():
+                print(unrecorded_model_message(self.table_name, self.embedder.model_name))
+        return table
+
+    def _changed_items(self, items: List[DataItem]) -> List[DataItem]:
+        """Keep only items whose (source, content_hash) is not already stored."""
+        if not items:
+            return items
+        existing = self._existing_hashes([item.source for item in items])
+        return [
+            item
+            for item in items
+            if existing.get(item.source) != content_hash(item.content)
+        ]
+
+    def _existing_hashes(self, sources: List[str]) -> Dict[str, str]:
+        """Fetch the stored content hash of every given source in a single query."""
+        rows = (
+            self.table.search()
+            .where(sql_in("source", sources))
+            .select(["source", "content_hash"])
+            .limit(len(sources))
+            .to_arrow()
+            .to_pydict()
+        )
+        return dict(zip(rows["source"], rows["content_hash"]))
+
+    def _convert_item_to_entry(
+        self, item: DataItem, vector: Optional[List[float]] = None
+    ) -> dict:
+        """Convert a DataItem to match table schema (vectors come from the cache when possible)."""
+        if vector is None:
+            vector = self.get_vector(item.content)
+        return item_to_entry(item, vector)
\ No newline at end of file
@@ -0,0 +1,131 @@
+import os
+from typing import TYPE_CHECKING, List, Optional, Sequence
+import numpy as np
+from src.interface.base_embedder import BaseEmbedder
+from src.util.batching import estimate_tokens
+from src.util.clients import get_async_openai_client, get_openai_client
+from src.util.rate_limit import get_rate_limiter
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+
+class OpenAIEmbedder(BaseEmbedder):
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        dimensions: int = 1536,
+        client: Optional["OpenAI"] = None,
+    ):
+        self.model_name = model
+        self.dimensions = dimensions
+        self._client = client
+        self.rate_limiter = get_rate_limiter("openai")
+
+    @property
+    def client(self) -> "OpenAI":
+        # The shared client is only built when the first request goes out.
+        return self._client or get_openai_client()
+
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        # Looked up on use, so it belongs to the running event loop.
+        return get_async_openai_client()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.rate_limiter.call(
+            self.client.embeddings.create,
+            input=texts,
+            model=self.model_name,
+            dimensions=self.dimensions,
+            tokens=sum(estimate_tokens(text) for text in texts),
+        )
+        return self._vectors_in_order(response)
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        response = await self.rate_limiter.acall(
+            self.async_client.embeddings.create,
+            input=texts,
+            model=self.model_name,
+            dimensions=self.dimensions,
+            tokens=sum(estimate_tokens(text) for text in texts),
+        )
+        return self._vectors_in_order(response)
+
+    @staticmethod
+    def _vectors_in_order(response) -> List[List[float]]:
+        # The API may return embeddings out of order; map them back by index.
+        data = sorted(response.data, key=lambda d: d.index)
+        return [d.embedding for d in data]
+
+
+class LocalHashEmbedder(BaseEmbedder):
+    """
+    Deterministic offline embedder: hashed character n-grams projected onto a
+    fixed number of dimensions (the "hashing trick"), vectorised with NumPy.
+    Needs no network or API key, so benchmarks and CI can run at full speed.
+    """
+
+    _PRIME = np.uint64(1099511628211)
+    _MIX = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, dimensions: int = 1536, ngram_sizes: Sequence[int] = (3, 4, 5)):
+        self.model_name = "local-hash-ngram-" + "-".join(str(n) for n in ngram_sizes)
+        self.dimensions = dimensions
+        self.ngram_sizes = tuple(ngram_sizes)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self._embed_text(text)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-12)
+        return matrix.tolist()
+
+    def _embed_text(self, text: str) -> np.ndarray:
+        normalized = " ".join(text.lower().split()).encode("utf-8")
+        data = np.frombuffer(normalized, dtype=np.uint8).astype(np.uint64)
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+
+        for n in self.ngram_sizes:
+            count = len(data) - n + 1
+            if count <= 0:
+                continue
+            # Polynomial rolling hash of every n-gram at once (wraps mod 2^64).
+            hashes = np.full(count, n, dtype=np.uint64)
+            for j in range(n):
+                hashes = hashes * self._PRIME + data[j : j + count]
+            hashes = (hashes ^ (hashes >> np.uint64(29))) * self._MIX
+
+            buckets = (hashes % np.uint64(self.dimensions)).astype(np.int64)
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+            vector += np.bincount(buckets, weights=signs, minlength=self.dimensions)
+
+        return vector
+
+
+EMBEDDING_PROVIDERS = {
+    "openai": OpenAIEmbedder,
+    "local": LocalHashEmbedder,
+}
+
+
+def create_embedder(
+    provider: Optional[str] = None, dimensions: Optional[int] = None
+) -> BaseEmbedder:
+    """
+    Create the embedder selected by `provider` or the RAG_EMBEDDING_PROVIDER env var.
+    `dimensions` (or RAG_EMBEDDING_DIMENSIONS) truncates text-embedding-3 vectors,
+    which are trained so that shorter prefixes still work (Matryoshka-style).
+    """
+    provider = provider or os.getenv("RAG_EMBEDDING_PROVIDER", "openai")
+    if dimensions is None and os.getenv("RAG_EMBEDDING_DIMENSIONS"):
+        dimensions = int(os.getenv("RAG_EMBEDDING_DIMENSIONS"))
+    if provider not in EMBEDDING_PROVIDERS:
+        raise ValueError(
+            f"Unknown embedding provider '{provider}'. "
+            f"Choose one of: {', '.join(EMBEDDING_PROVIDERS)}"
+        )
+    if dimensions is None:
+        return EMBEDDING_PROVIDERS[provider]()
+    return EMBEDDING_PROVIDERS[provider](dimensions=dimensions)
@@ -52,13 +52,12 @@ Then return the result in <result>...</result> tags — either as 'true' or 'fal
 import difflib
 import json
 import os
-import time
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
 
-from src.interface import BaseEvaluator, EvaluationResult
+from src.interface import BaseEmbedder, BaseEvaluator, EvaluationResult
+from src.impl.embedder import create_embedder
 
 
 @dataclass
@@ -68,8 +67,11 @@ class Evaluator(BaseEvaluator):
     Usa comparación textual y, opcionalmente, embeddings semánticos.
     """
 
+    embedder: Optional[BaseEmbedder] = None
+
     def __post_init__(self):
-        self.client = OpenAI()
+        if self.embedder is None:
+            self.embedder = create_embedder()
 
     # --------------------------------------------------------------
     # 🔹 Método principal de evaluación
@@ -123,19 +125,11 @@ class Evaluator(BaseEvaluator):
     # --------------------------------------------------------------
     def _semantic_similarity(self, text_a: str, text_b: str) -> float:
         """
-        Usa embeddings de OpenAI para calcular similitud coseno entre textos.
-        Requiere una API key válida.
+        Usa el embedder configurado para calcular similitud coseno entre textos.
         """
         try:
-            # evita rate limit
-            time.sleep(1.5)
-
-            emb = self.client.embeddings.create(
-                model="text-embedding-3-small",
-                input=[text_a, text_b],
-            )
-
-            vec_a, vec_b = emb.data[0].embedding, emb.data[1].embedding
+            # El embedder aplica el rate limit del proveedor.
+            vec_a, vec_b = self.embedder.embed([text_a, text_b])
             dot = sum(a * b for a, b in zip(vec_a, vec_b))
             norm_a = sum(a * a for a in vec_a) ** 0.5
             norm_b = sum(b * b for b in vec_b) ** 0.5
@@ -1,28 +1,145 @@
+import multiprocessing
 import os
-from typing import List
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
 from src.interface.base_datastore import DataItem
 from src.interface.base_indexer import BaseIndexer
-from docling.document_converter import DocumentConverter
-from docling.chunking import HybridChunker, DocChunk
+from src.util.batching import tokenizer_counter
+from src.util.metadata import extract_document_metadata
+
+if TYPE_CHECKING:
+    from docling.chunking import DocChunk, HybridChunker
+    from docling.document_converter import DocumentConverter
 
 
 class Indexer(BaseIndexer):
-    def __init__(self):
-        self.converter = DocumentConverter()
-        self.chunker = HybridChunker()
+    def __init__(self, workers: Optional[int] = None):
+        # Docling's converter and the chunker tokenizer load models, so they
+        # are only created when a document is actually indexed.
+        self._converter: Optional["DocumentConverter"] = None
+        self._chunker: Optional["HybridChunker"] = None
+        self._count_tokens: Optional[Callable[[str], int]] = None
+        # Documents are converted and chunked in this many processes
+        # (RAG_INDEX_WORKERS); each one keeps its own warm converter.
+        self.workers = workers or int(os.getenv("RAG_INDEX_WORKERS", "1"))
+        # Documents that failed to convert in the last run, with the error.
+        self.failures: Dict[str, str] = {}
         # Disable tokenizers parallelism to avoid OOM errors.
         os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+    @property
+    def converter(self) -> "DocumentConverter":
+        if self._converter is None:
+            from docling.document_converter import DocumentConverter
+
+            self._converter = DocumentConverter()
+        return self._converter
+
+    @property
+    def chunker(self) -> "HybridChunker":
+        if self._chunker is None:
+            from docling.chunking import HybridChunker
+
+            self._chunker = HybridChunker()
+        return self._chunker
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens in `text` according to the chunker's own tokenizer."""
+        if self._count_tokens is None:
+            self._count_tokens = tokenizer_counter(getattr(self.chunker, "tokenizer", None))
+        return self._count_tokens(text)
+
     def index(self, document_paths: List[str]) -> List[DataItem]:
         items = []
-        for document_path in document_paths:
-            document = self.converter.convert(document_path).document
-            chunks: List[DocChunk] = self.chunker.chunk(document)
-            items.extend(self._items_from_chunks(chunks))
+        for document_items in self.iter_documents(document_paths):
+            items.extend(document_items)
         return items
 
-    def _items_from_chunks(self, chunks: List[DocChunk]) -> List[DataItem]:
+    def iter_documents(self, document_paths: List[str]) -> Iterator[List[DataItem]]:
+        """
+        Yield the items of each document, in order. A document that fails to
+        convert is reported and skipped (see `failures`), the rest go on.
+        """
+        self.failures = {}
+        if min(self.workers, os.cpu_count() or 1) > 1 and len(document_paths) > 1:
+            results = self._convert_in_pool(document_paths)
+        else:
+            results = ((path, self._convert(path)) for path in document_paths)
+
+        for document_path, (items, error) in results:
+            if error is not None:
+                self.failures[document_path] = error
+                print(f"❌ Failed to convert {document_path}: {error}")
+                continue
+            yield items
+
+        if self.failures:
+            print(f"⚠️ {len(self.failures)}/{len(document_paths)} document(s) could not be indexed.")
+
+    def _convert(self, document_path: str) -> Tuple[List[DataItem], Optional[str]]:
+        """Convert and chunk one document; returns its items, or the error."""
+        try:
+            document = self.converter.convert(document_path).document
+            chunks: List["DocChunk"] = list(self.chunker.chunk(document))
+            return self._items_from_chunks(chunks), None
+        except Exception as e:
+            return [], f"{type(e).__name__}: {e}"
+
+    def _convert_in_pool(
+        self, document_paths: List[str]
+    ) -> Iterator[Tuple[str, Tuple[List[DataItem], Optional[str]]]]:
+        """
+        Convert documents in a pool of worker processes, each with a warm
+        converter. Only a few documents per worker are in flight at a time,
+        so results stream in order without piling up in memory.
+        """
+        cores = os.cpu_count() or 1
+        workers = max(1, min(self.workers, len(document_paths), cores))
+        # Split the cores between the workers instead of oversubscribing them.
+        threads = max(1, cores // workers)
+        # "spawn": forking a process that already runs threads or holds
+        # models is unsafe, and the workers import docling themselves anyway.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads,),
+        ) as executor:
+            paths = iter(document_paths)
+            pending: "deque[Tuple[str, Future]]" = deque()
+
+            def submit_next() -> None:
+                path = next(paths, None)
+                if path is None:
+                    return
+                try:
+                    future = executor.submit(_convert_in_worker, path)
+                except Exception as e:  # The pool broke (e.g. the OOM killer).
+                    future = Future()
+                    future.set_exception(e)
+                pending.append((path, future))
+
+            for _ in range(2 * workers):
+                submit_next()
+            while pending:
+                path, future = pending.popleft()
+                submit_next()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = ([], f"{type(e).__name__}: {e}")
+                yield path, result
+
+    def _items_from_chunks(self, chunks: List["DocChunk"]) -> List[DataItem]:
         items = []
+        if not chunks:
+            return items
+
+        # Issuer, period and document type are shared by every chunk of the document.
+        sample_text = "\n".join(chunk.text for chunk in chunks[:5])
+        metadata = extract_document_metadata(chunks[0].meta.origin.filename, sample_text)
+
         for i, chunk in enumerate(chunks):
             # content_headings = "## " + ", ".join(chunk.meta.headings)
             headings = chunk.meta.headings
@@ -34,7 +151,37 @@ class Indexer(BaseIndexer):
                 content_headings = "## "
             content_text = f"{content_headings}\n{chunk.text}"
             source = f"{chunk.meta.origin.filename}:{i}"
-            item = DataItem(content=content_text, source=source)
+            item = DataItem(
+                content=content_text,
+                source=source,
+                page=self._page_number(chunk),
+                **metadata,
+            )
             items.append(item)
 
-        return items
\ No newline at end of file
+        return items
+
+    @staticmethod
+    def _page_number(chunk: "DocChunk"):
+        for doc_item in chunk.meta.doc_items:
+            for prov in doc_item.prov:
+                return prov.page_no
+        return None
+
+
+# Per-process state of the conversion workers (see Indexer._convert_in_pool).
+_worker_indexer: Optional[Indexer] = None
+
+
+def _init_worker(threads: int) -> None:
+    global _worker_indexer
+    # Set before docling (and torch) are imported by this process.
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    _worker_indexer = Indexer(workers=1)
+    # Load the models once, before the first document arrives.
+    _worker_indexer.converter
+    _worker_indexer.chunker
+
+
+def _convert_in_worker(document_path: str) -> Tuple[List[DataItem], Optional[str]]:
+    return _worker_indexer._convert(document_path)
@@ -0,0 +1,459 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.interface.base_datastore import (
+    BaseDatastore,
+    DataItem,
+    SearchResults,
+    document_of,
+    stale_documents,
+)
+from src.interface.base_embedder import BaseEmbedder
+from src.impl.datastore import Datastore, content_hash
+from src.impl.embedder import create_embedder
+from src.util.batching import MAX_INPUT_TOKENS
+from src.util.embedding_cache import EmbeddingCache
+from src.util.embedding_mixin import EmbeddingMixin
+
+# Row metadata stored next to the vectors (same columns as `rag-table`, minus the vector).
+ITEMS_SCHEMA = pa.schema(
+    [
+        pa.field("content", pa.utf8()),
+        pa.field("source", pa.utf8()),
+        pa.field("content_hash", pa.utf8()),
+        pa.field("issuer", pa.utf8()),
+        pa.field("period", pa.utf8()),
+        pa.field("doc_type", pa.utf8()),
+        pa.field("page", pa.int32()),
+    ]
+)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class NumpyDatastore(EmbeddingMixin, BaseDatastore):
+    """
+    Exact cosine search over an in-memory float32 matrix, for small corpora
+    (a few thousand chunks) where LanceDB's open/scan overhead dominates.
+
+    On disk the store is `vectors-<id>.npy` + `items-<id>.arrow` (Arrow IPC),
+    and `manifest.json` points at the current pair. Saving writes a new pair
+    and then swaps the manifest with os.replace, so readers never see a half
+    written store. With `mmap=True` both files are memory-mapped read-only:
+    worker processes serving the same store share one copy through the OS
+    page cache and start without reading the data.
+    """
+
+    DB_PATH = "data/numpy-store"
+    MANIFEST = "manifest.json"
+
+    def __init__(
+        self,
+        embedder: Optional[BaseEmbedder] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        db_path: Optional[str] = None,
+        mmap: bool = False,
+        embedding_batch_size: int = 256,
+        embedding_batch_max_tokens: int = 100_000,
+        embedding_max_input_tokens: int = MAX_INPUT_TOKENS,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        embedding_oversize: str = "split",
+        max_inflight_batches: int = 4,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 24 * 3600,
+    ):
+        self._init_embeddings(
+            embedder or create_embedder(),
+            embedding_cache=embedding_cache,
+            query_cache_size=query_cache_size,
+            query_cache_ttl=query_cache_ttl,
+            embedding_batch_size=embedding_batch_size,
+            embedding_batch_max_tokens=embedding_batch_max_tokens,
+            embedding_max_input_tokens=embedding_max_input_tokens,
+            count_tokens=count_tokens,
+            embedding_oversize=embedding_oversize,
+            max_inflight_batches=max_inflight_batches,
+        )
+        self.db_path = db_path or os.getenv("RAG_NUMPY_STORE_PATH", self.DB_PATH)
+        self.mmap = mmap
+        self._lock = threading.Lock()
+        self._manifest_mtime: Optional[float] = None
+        # Loaded on first use.
+        self._vectors: Optional[np.ndarray] = None
+        self._items: Optional[pa.Table] = None
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            self.load()
+        return self._vectors
+
+    @property
+    def items(self) -> pa.Table:
+        if self._items is None:
+            self.load()
+        return self._items
+
+    # ---------------------------------------------
+    # Persistence
+    # ---------------------------------------------
+    def load(self) -> None:
+        """(Re)load the store from the current manifest."""
+        manifest_path = os.path.join(self.db_path, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            self._set(np.zeros((0, self.vector_dimensions), np.float32), ITEMS_SCHEMA.empty_table())
+            return
+
+        self._manifest_mtime = os.path.getmtime(manifest_path)
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        stored_model = manifest.get("embedding_model", self.embedder.model_name)
+        if stored_model != self.embedder.model_name:
+            raise ValueError(
+                f"The store in {self.db_path} holds vectors from '{stored_model}', but the "
+                f"embedder is '{self.embedder.model_name}' (RAG_EMBEDDING_PROVIDER). Use the "
+                "same embedder, or reset the store and add the documents again."
+            )
+        vectors = np.load(
+            os.path.join(self.db_path, manifest["vectors"]),
+            mmap_mode="r" if self.mmap else None,
+        )
+        if vectors.shape[1] != self.vector_dimensions:
+            # Never reset here: with shared mmap readers, one misconfigured
+            # worker would wipe the store for all of them.
+            raise ValueError(
+                f"The store in {self.db_path} holds {vectors.shape[1]}-dim vectors, but the "
+                f"embedder has {self.vector_dimensions} (RAG_EMBEDDING_DIMENSIONS). Use the "
+                "same settings, or reset the store and add the documents again."
+            )
+        items_path = os.path.join(self.db_path, manifest["items"])
+        if self.mmap:
+            # Zero-copy: the Arrow buffers point straight into the mapped file.
+            items = pa.ipc.open_file(pa.memory_map(items_path, "r")).read_all()
+        else:
+            with pa.OSFile(items_path, "rb") as source:
+                items = pa.ipc.open_file(source).read_all()
+        self._set(vectors, items)
+
+    def refresh(self) -> bool:
+        """Reload if another process saved a new version. Returns True if it did."""
+        manifest_path = os.path.join(self.db_path, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            return False
+        if os.path.getmtime(manifest_path) == self._manifest_mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self) -> None:
+        """Write the store atomically: new files first, then swap the manifest."""
+        self._check_writable()
+        os.makedirs(self.db_path, exist_ok=True)
+        version = uuid.uuid4().hex[:12]
+        manifest = {
+            "vectors": f"vectors-{version}.npy",
+            "items": f"items-{version}.arrow",
+            "dimensions": self.vector_dimensions,
+            "embedding_model": self.embedder.model_name,
+            "rows": len(self.items),
+        }
+        np.save(os.path.join(self.db_path, manifest["vectors"]), np.ascontiguousarray(self.vectors))
+        items_path = os.path.join(self.db_path, manifest["items"])
+        with pa.OSFile(items_path, "wb") as sink:
+            # Uncompressed, so readers can memory-map it.
+            with pa.ipc.new_file(sink, self.items.schema) as writer:
+                writer.write_table(self.items)
+
+        tmp_path = os.path.join(self.db_path, f"{self.MANIFEST}.{version}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.db_path, self.MANIFEST))
+        self._manifest_mtime = os.path.getmtime(os.path.join(self.db_path, self.MANIFEST))
+        self._remove_stale_files(keep={manifest["vectors"], manifest["items"]})
+
+    def _check_writable(self) -> None:
+        if self.mmap:
+            raise RuntimeError(
+                f"{self.db_path} is opened read-only (mmap=True); write through a "
+                "NumpyDatastore opened with mmap=False."
+            )
+
+    def reset(self) -> None:
+        self._check_writable()
+        self._set(np.zeros((0, self.vector_dimensions), np.float32), ITEMS_SCHEMA.empty_table())
+        self.save()
+        print(f"✅ NumPy store Reset/Created in {self.db_path}")
+
+    def _set(self, vectors: np.ndarray, items: pa.Table) -> None:
+        self._vectors = vectors
+        self._items = items
+        self._row_by_source: Optional[Dict[str, int]] = None
+
+    @property
+    def row_by_source(self) -> Dict[str, int]:
+        # Built on first write only, so read-only workers don't pay for it.
+        if self._row_by_source is None:
+            self._row_by_source = {
+                source: row
+                for row, source in enumerate(self.items.column("source").to_pylist())
+            }
+        return self._row_by_source
+
+    def _remove_stale_files(self, keep: set) -> None:
+        for name in os.listdir(self.db_path):
+            if name.startswith(("vectors-", "items-")) and name not in keep:
+                try:
+                    os.remove(os.path.join(self.db_path, name))
+                except OSError:
+                    pass  # Another process may still have it mapped.
+
+    # ---------------------------------------------
+    # Ingest
+    # ---------------------------------------------
+    def add_items(self, items: List[DataItem], update_indexes: bool = True) -> None:
+        """Upsert items by source and persist the store (exact search needs no index)."""
+        self._check_writable()
+        hashes = self.items.column("content_hash").to_pylist()
+        items = list({item.source: item for item in items}.values())
+        changed = [
+            item
+            for item in items
+            if item.source not in self.row_by_source
+            or hashes[self.row_by_source[item.source]] != content_hash(item.content)
+        ]
+        print(f"♻️  {len(items) - len(changed)}/{len(items)} items unchanged, skipping re-embedding.")
+        if not changed:
+            return
+
+        new_vectors = _normalize_rows(
+            np.asarray(self.get_vectors([item.content for item in changed]), dtype=np.float32)
+        )
+        new_items = pa.Table.from_pylist(
+            [
+                {
+                    "content": item.content,
+                    "source": item.source,
+                    "content_hash": content_hash(item.content),
+                    "issuer": item.issuer,
+                    "period": item.period,
+                    "doc_type": item.doc_type,
+                    "page": item.page,
+                }
+                for item in changed
+            ],
+            schema=ITEMS_SCHEMA,
+        )
+
+        with self._lock:
+            replaced = {item.source for item in changed}
+            keep = np.array(
+                [source not in replaced for source in self.items.column("source").to_pylist()],
+                dtype=bool,
+            )
+            vectors = np.concatenate([np.asarray(self.vectors)[keep], new_vectors])
+            table = pa.concat_tables([self.items.filter(pa.array(keep)), new_items])
+            self._set(vectors, table)
+            self.save()
+        print(f"🧠 Embedding cache: {self.embedding_cache.stats()}")
+
+    def sync_documents(
+        self,
+        sources_by_document: Dict[str, Iterable[str]],
+        keep_documents: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Drop chunks that no longer exist and persist the store."""
+        self._check_writable()
+        with self._lock:
+            sources = self.items.column("source").to_pylist()
+            stale = stale_documents(sources, sources_by_document, keep_documents)
+            if not stale:
+                return 0
+
+            def is_current(source: str) -> bool:
+                document = document_of(source)
+                return document not in stale or source in (stale[document] or ())
+
+            keep = np.fromiter(map(is_current, sources), dtype=bool, count=len(sources))
+            self._set(np.asarray(self.vectors)[keep], self.items.filter(pa.array(keep)))
+            self.save()
+        deleted = int((~keep).sum())
+        print(f"🧽 Deleted {deleted} stale rows from {len(stale)} document(s).")
+        return deleted
+
+    # ---------------------------------------------
+    # Search
+    # ---------------------------------------------
+    def search(
+        self, query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None, **_: Any
+    ) -> List[str]:
+        return self.search_results(query, top_k, filters).contents()
+
+    def search_results(
+        self, query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None, **_: Any
+    ) -> SearchResults:
+        """Exact cosine search: one matrix-vector product plus argpartition."""
+        return self.search_many([query], top_k, filters)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Any] = None,
+        **_: Any,
+    ) -> List[SearchResults]:
+        """Score every query against the (filtered) matrix in a single matmul per filter."""
+        if not queries:
+            return []
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * len(queries)
+        query_matrix = _normalize_rows(
+            np.asarray(self.get_query_vectors(queries), dtype=np.float32)
+        )
+
+        vectors, items = self.vectors, self.items
+        groups: Dict[frozenset, List[int]] = {}
+        for i, query_filters in enumerate(filters):
+            groups.setdefault(self._filter_key(query_filters), []).append(i)
+
+        results: List[Optional[SearchResults]] = [None] * len(queries)
+        for indices in groups.values():
+            rows = self._filter_rows(items, filters[indices[0]])
+            candidates = vectors if rows is None else vectors[rows]
+            scores = query_matrix[indices] @ candidates.T
+            for position, i in enumerate(indices):
+                top = self._top_k(scores[position], top_k)
+                table_rows = top if rows is None else rows[top]
+                hits = items.take(pa.array(table_rows, type=pa.int64()))
+                top_scores = scores[position][top]
+                results[i] = SearchResults.from_columns(
+                    hits.column("content"),
+                    hits.column("source"),
+                    distances=1.0 - top_scores,
+                    scores=top_scores,
+                )
+        return results
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    @staticmethod
+    def _filter_values(value: Any) -> list:
+        return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+    @classmethod
+    def _filter_key(cls, filters: Optional[Dict[str, Any]]) -> frozenset:
+        """Hashable form of {column: value} filters; equal filters give equal keys."""
+        return frozenset(
+            (column, frozenset(cls._filter_values(value)))
+            for column, value in (filters or {}).items()
+        )
+
+    @classmethod
+    def _filter_rows(cls, items: pa.Table, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Row numbers matching {column: value} filters (lists mean IN), or None for all rows."""
+        if not filters:
+            return None
+        mask = None
+        for column, value in filters.items():
+            condition = pc.is_in(
+                items.column(column),
+                value_set=pa.array(
+                    cls._filter_values(value), items.schema.field(column).type
+                ),
+            )
+            mask = condition if mask is None else pc.and_(mask, condition)
+        return np.flatnonzero(mask.to_numpy(zero_copy_only=False))
+
+    # ---------------------------------------------
+    # Maintenance (exact search needs no index)
+    # ---------------------------------------------
+    def build_index(self, force: bool = False) -> Optional[float]:
+        print("ℹ️  The NumPy store uses exact search, there is no index to build.")
+        return None
+
+    def maintain(self, retention: timedelta = timedelta(days=7)) -> Dict[str, Any]:
+        """Rewrite the store and remove files no manifest points at."""
+        self._check_writable()
+        before = self.storage_stats()
+        start = time.perf_counter()
+        with self._lock:
+            self.save()
+        elapsed = time.perf_counter() - start
+        return {"before": before, "after": self.storage_stats(), "seconds": elapsed}
+
+    def storage_stats(self, scan_repeats: int = 3) -> Dict[str, Any]:
+        files = [
+            name
+            for name in (os.listdir(self.db_path) if os.path.isdir(self.db_path) else [])
+            if name.startswith(("vectors-", "items-", self.MANIFEST))
+        ]
+        probe = np.ones(self.vector_dimensions, dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(scan_repeats):
+            self.vectors @ probe
+        scan_ms = (time.perf_counter() - start) * 1000 / scan_repeats
+        rows = len(self.items)
+        files_on_disk = sum(1 for name in files if name.startswith("vectors-"))
+        return {
+            "rows": rows,
+            "files_on_disk": files_on_disk,
+            "rows_per_file": round(rows / files_on_disk) if files_on_disk else 0,
+            "versions": 1,
+            "bytes": sum(os.path.getsize(os.path.join(self.db_path, name)) for name in files),
+            "scan_ms": round(scan_ms, 2),
+        }
+
+
+def export_from_lancedb(
+    datastore: Datastore, db_path: str, batch_size: int = 65_536
+) -> NumpyDatastore:
+    """
+    Export `rag-table` to a read-only NumPy store that worker processes can
+    open with `mmap=True`. Vectors are cast to float32 and normalised, so the
+    exported store scores with a plain dot product.
+    """
+    columns = ITEMS_SCHEMA.names
+    total = datastore.table.count_rows()
+    vectors = np.empty((total, datastore.vector_dimensions), dtype=np.float32)
+    batches = []
+    row = 0
+    # Streamed batch by batch: only one batch of vectors is in memory besides
+    # the output matrix, and each one is normalised in place.
+    scan = datastore.table.search().select(["vector"] + columns).limit(None)
+    for batch in scan.to_batches(batch_size):
+        if row + batch.num_rows > total:  # Rows added since count_rows().
+            batch = batch.slice(0, total - row)
+        block = vectors[row : row + batch.num_rows]
+        flat = batch.column("vector").flatten().to_numpy(zero_copy_only=False)
+        block[:] = flat.reshape(batch.num_rows, -1)
+        block /= np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+        batches.append(pa.Table.from_batches([batch]).select(columns).cast(ITEMS_SCHEMA))
+        row += batch.num_rows
+
+    exported = NumpyDatastore(
+        embedder=datastore.embedder,
+        embedding_cache=datastore.embedding_cache,
+        db_path=db_path,
+    )
+    items = pa.concat_tables(batches) if batches else ITEMS_SCHEMA.empty_table()
+    exported._set(vectors[:row], items)
+    exported.save()
+    print(f"📤 Exported {row} rows from {datastore.table_name} to {db_path}")
+    return exported
@@ -0,0 +1,325 @@
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import pyarrow as pa
+from src.interface.base_datastore import BaseDatastore, DataItem, SearchResults
+from src.interface.base_embedder import BaseEmbedder
+from src.impl.datastore import Datastore
+from src.impl.embedder import create_embedder
+from src.util.embedding_cache import EmbeddingCache
+from src.util.embedding_mixin import EmbeddingMixin
+from src.util.sql import sql_filter
+
+
+def _slug(value: str) -> str:
+    """Table-name-safe version of a partition value, e.g. "Pampa Energía" -> "pampa_energia"."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return re.sub(r"[^a-z0-9]+", "_", folded).strip("_")
+
+
+def _year_of_period(period: str) -> str:
+    # Periods are normalised to e.g. "3Q25" by the indexer.
+    return f"20{period[-2:]}" if period else ""
+
+
+class PartitionedDatastore(EmbeddingMixin, BaseDatastore):
+    """
+    Shards the store into one LanceDB table per issuer (or per year), e.g.
+    `rag-table--ypf`. Ingest writes to the shards in parallel and searches only
+    hit the shards the filters point at, so reindexing one issuer does not
+    rewrite or re-scan the rest of the corpus.
+    """
+
+    # partition key -> (value of an item, filter column it is derived from)
+    PARTITION_KEYS: Dict[str, tuple] = {
+        "issuer": (lambda item: item.issuer, "issuer", lambda value: value),
+        "year": (lambda item: _year_of_period(item.period), "period", _year_of_period),
+    }
+    UNKNOWN_PARTITION = "sin_clasificar"
+    # Datastore settings that also apply to the embeddings done here.
+    EMBEDDING_KWARGS = (
+        "embedding_batch_size",
+        "embedding_batch_max_tokens",
+        "embedding_max_input_tokens",
+        "count_tokens",
+        "embedding_oversize",
+        "max_inflight_batches",
+    )
+
+    def __init__(
+        self,
+        partition_by: Optional[str] = None,
+        embedder: Optional[BaseEmbedder] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        db_path: Optional[str] = None,
+        max_workers: int = 4,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 24 * 3600,
+        **datastore_kwargs: Any,
+    ):
+        self.partition_by = partition_by or os.getenv("RAG_PARTITION_BY", "issuer")
+        if self.partition_by not in self.PARTITION_KEYS:
+            raise ValueError(
+                f"Unknown partition key '{self.partition_by}'. "
+                f"Choose one of: {', '.join(self.PARTITION_KEYS)}"
+            )
+        # Caches are shared by every shard, so a query is embedded once no
+        # matter how many shards it hits.
+        self._init_embeddings(
+            embedder or create_embedder(),
+            embedding_cache=embedding_cache,
+            query_cache_size=query_cache_size,
+            query_cache_ttl=query_cache_ttl,
+            **{
+                name: datastore_kwargs[name]
+                for name in self.EMBEDDING_KWARGS
+                if name in datastore_kwargs
+            },
+        )
+        self.db_path = db_path or Datastore.DB_PATH
+        self.max_workers = max_workers
+        self.datastore_kwargs = datastore_kwargs
+        self.table_prefix = f"{Datastore.DB_TABLE_NAME}--"
+        # Connected (and the shards listed) on first use.
+        self._vector_db = None
+        self._shards: Optional[Dict[str, Datastore]] = None
+        self._shards_lock = threading.RLock()
+
+    @property
+    def vector_db(self):
+        with self._shards_lock:
+            if self._vector_db is None:
+                import lancedb
+
+                self._vector_db = lancedb.connect(self.db_path)
+            return self._vector_db
+
+    @property
+    def shards(self) -> Dict[str, Datastore]:
+        with self._shards_lock:
+            if self._shards is None:
+                self._shards = {}
+                for table_name in self.vector_db.table_names(limit=10_000):
+                    if table_name.startswith(self.table_prefix):
+                        self.partition(table_name[len(self.table_prefix) :])
+            return self._shards
+
+    def partition(self, key: str) -> Datastore:
+        """Return the shard for a partition key (e.g. "ypf"), creating it if needed."""
+        key = _slug(key) or self.UNKNOWN_PARTITION
+        with self._shards_lock:
+            shards = self.shards
+            if key not in shards:
+                shards[key] = Datastore(
+                    embedder=self.embedder,
+                    embedding_cache=self.embedding_cache,
+                    db_path=self.db_path,
+                    table_name=f"{self.table_prefix}{key}",
+                    query_cache=self.query_cache,
+                    **self.datastore_kwargs,
+                )
+            return shards[key]
+
+    def reset(self) -> None:
+        for key in list(self.shards):
+            self.reset_partition(key)
+
+    def reset_partition(self, key: str) -> None:
+        """Drop a single shard, e.g. before reindexing one issuer."""
+        with self._shards_lock:
+            shard = self.shards.pop(_slug(key) or self.UNKNOWN_PARTITION, None)
+        if shard is not None:
+            self.vector_db.drop_table(shard.table_name)
+            print(f"🗑️  Dropped partition {shard.table_name}")
+
+    def add_items(self, items: List[DataItem], update_indexes: bool = True) -> None:
+        item_key = self.PARTITION_KEYS[self.partition_by][0]
+        groups: Dict[str, List[DataItem]] = {}
+        for item in items:
+            groups.setdefault(_slug(item_key(item)) or self.UNKNOWN_PARTITION, []).append(item)
+
+        shards = {key: self.partition(key) for key in groups}
+        self._fan_out(
+            lambda key: shards[key].add_items(groups[key], update_indexes), list(groups)
+        )
+        print(f"🧩 Wrote {len(items)} items to {len(groups)} partition(s)")
+
+    def update_indexes(self) -> None:
+        self._fan_out(lambda shard: shard.update_indexes(), list(self.shards.values()))
+
+    def sync_documents(
+        self,
+        sources_by_document: Dict[str, Iterable[str]],
+        keep_documents: Optional[Iterable[str]] = None,
+    ) -> int:
+        sources_by_document = {doc: list(sources) for doc, sources in sources_by_document.items()}
+        keep_documents = None if keep_documents is None else list(keep_documents)
+        return sum(
+            self._fan_out(
+                lambda shard: shard.sync_documents(sources_by_document, keep_documents),
+                list(self.shards.values()),
+            )
+        )
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        **search_kwargs: Any,
+    ) -> List[str]:
+        return self.search_results(query, top_k, filters, **search_kwargs).contents()
+
+    def search_results(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        **search_kwargs: Any,
+    ) -> SearchResults:
+        """
+        Search only the shards matching `filters`. Vector results are merged by
+        score (cosine similarity, comparable across shards); hybrid searches
+        pool every shard's candidates and fuse them once.
+        """
+        shards = self._shards_for(filters)
+        if not shards:
+            return SearchResults.empty()
+        if len(shards) == 1:
+            return shards[0].search_results(query, top_k, filters, **search_kwargs)
+
+        self.get_query_vector(query)  # Embed once before fanning out.
+        if self._is_hybrid(shards, search_kwargs):
+            return self._hybrid_search(query, top_k, filters, shards, **search_kwargs)
+        results = self._fan_out(
+            lambda shard: shard.search_results(query, top_k, filters, **search_kwargs),
+            shards,
+        )
+        return SearchResults.merge(results, top_k)
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Any] = None,
+        **search_kwargs: Any,
+    ) -> List[SearchResults]:
+        """
+        Search many queries: each shard runs one batched search over the
+        queries routed to it, then the per-shard results are merged by score.
+        """
+        if not queries:
+            return []
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * len(queries)
+        # One batched embedding call up front; the shards read the shared query cache.
+        self.get_query_vectors(queries)
+        if self._is_hybrid(list(self.shards.values()), search_kwargs):
+            # RRF scores only reflect ranks within a shard, so each query is
+            # fused across its shards instead of merging per-shard results.
+            return self._fan_out(
+                lambda i: self.search_results(queries[i], top_k, filters[i], **search_kwargs),
+                list(range(len(queries))),
+            )
+
+        routed: Dict[str, List[int]] = {}
+        for i, query_filters in enumerate(filters):
+            for shard in self._shards_for(query_filters):
+                routed.setdefault(shard.table_name, []).append(i)
+        shards = {shard.table_name: shard for shard in self.shards.values()}
+
+        def search_shard(table_name: str) -> List[SearchResults]:
+            indices = routed[table_name]
+            return shards[table_name].search_many(
+                [queries[i] for i in indices],
+                top_k,
+                [filters[i] for i in indices],
+                **search_kwargs,
+            )
+
+        per_query: List[List[SearchResults]] = [[] for _ in queries]
+        for table_name, results in zip(routed, self._fan_out(search_shard, list(routed))):
+            for i, result in zip(routed[table_name], results):
+                per_query[i].append(result)
+        return [SearchResults.merge(results, top_k) for results in per_query]
+
+    def build_index(self, force: bool = False) -> Optional[float]:
+        """(Re)build the vector index of every shard. Returns the total build time."""
+        times = [shard.build_index(force=force) for shard in self.shards.values()]
+        built = [elapsed for elapsed in times if elapsed is not None]
+        return sum(built) if built else None
+
+    def maintain(self, retention: timedelta = timedelta(days=7)) -> Dict[str, Any]:
+        reports = [shard.maintain(retention) for shard in self.shards.values()]
+        return {
+            "before": self._sum_stats([report["before"] for report in reports]),
+            "after": self._sum_stats([report["after"] for report in reports]),
+            "seconds": sum(report["seconds"] for report in reports),
+        }
+
+    def storage_stats(self) -> Dict[str, Any]:
+        return self._sum_stats([shard.storage_stats() for shard in self.shards.values()])
+
+    def _shards_for(self, filters: Optional[Dict[str, Any]]) -> List[Datastore]:
+        """Shards a query needs: the ones named by its filters, or all of them."""
+        _, column, to_key = self.PARTITION_KEYS[self.partition_by]
+        value = (filters or {}).get(column)
+        if not value:
+            return list(self.shards.values())
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        keys = {_slug(to_key(v)) for v in values}
+        return [shard for key, shard in self.shards.items() if key in keys]
+
+    @staticmethod
+    def _is_hybrid(shards: List[Datastore], search_kwargs: Dict[str, Any]) -> bool:
+        mode = search_kwargs.get("mode") or (shards[0].search_mode if shards else None)
+        return mode == "hybrid"
+
+    def _hybrid_search(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        shards: List[Datastore],
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        **_: Any,
+    ) -> SearchResults:
+        """Pool the shards' vector and full-text candidates, then fuse them once."""
+        where = sql_filter(filters)
+        candidates = self._fan_out(
+            lambda shard: shard.hybrid_candidates(query, top_k, where, nprobes, refine_factor),
+            shards,
+        )
+        limit = top_k * shards[0].hybrid_candidate_multiplier
+        vector_hits = (
+            pa.concat_tables([vector for vector, _ in candidates])
+            .sort_by("_distance")
+            .slice(0, limit)
+        )
+        text = [text for _, text in candidates if text is not None]
+        text_hits = (
+            pa.concat_tables(text).sort_by([("_score", "descending")]).slice(0, limit)
+            if text
+            else None
+        )
+        return Datastore.fuse_candidates(vector_hits, text_hits, top_k)
+
+    def _fan_out(self, fn: Callable, args: List[Any]) -> List[Any]:
+        if len(args) <= 1:
+            return [fn(arg) for arg in args]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(fn, args))
+
+    @staticmethod
+    def _sum_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        keys = ("rows", "files_on_disk", "versions", "bytes", "scan_ms")
+        total = {key: round(sum(s[key] for s in stats), 2) for key in keys}
+        files = total["files_on_disk"]
+        total["rows_per_file"] = round(total["rows"] / files) if files else 0
+        return total
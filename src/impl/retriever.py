@@ -1,44 +1,84 @@
-from src.interface.base_datastore import BaseDatastore
+from src.interface.base_datastore import BaseDatastore, SearchResults
 from src.interface.base_retriever import BaseRetriever
-import cohere
-from cohere.errors import TooManyRequestsError
+from src.util.metadata import extract_query_filters
+from src.util.rate_limit import get_rate_limiter
 from dotenv import load_dotenv
 import os
-import time
 
 class Retriever(BaseRetriever):
-    def __init__(self, datastore: BaseDatastore):
+    def __init__(self, datastore: BaseDatastore, candidate_multiplier: int = 2):
         self.datastore = datastore
+        # Hybrid first-stage search has better recall, so a smaller candidate
+        # pool (top_k * candidate_multiplier) is enough for the reranker.
+        self.candidate_multiplier = candidate_multiplier
+        self._cohere_client = None
+
+    @property
+    def cohere_client(self):
+        # cohere is imported and the client built only when something is reranked.
+        if self._cohere_client is None:
+            import cohere
+
+            load_dotenv()
+            self._cohere_client = cohere.ClientV2(os.getenv("CO_API_KEY"))
+        return self._cohere_client
 
     def search(self, query: str, top_k: int = 10) -> list[str]:
-        search_results = self.datastore.search(query, top_k=top_k * 3)
+        return self.search_results(query, top_k=top_k).contents()
+
+    def search_results(self, query: str, top_k: int = 10) -> SearchResults:
+        """Search and rerank, keeping sources and scores (score = rerank relevance)."""
+        candidates = top_k * self.candidate_multiplier
+        # Questions about one issuer (or one quarter) only search that slice.
+        filters = extract_query_filters(query)
+        search_results = self.datastore.search_results(
+            query, top_k=candidates, filters=filters
+        )
+        if filters and not len(search_results):
+            print(f"⚠️ No results for filters {filters}, searching everything.")
+            search_results = self.datastore.search_results(query, top_k=candidates)
         reranked_results = self._rerank(query, search_results, top_k=top_k)
         return reranked_results
 
+    def search_many(self, queries: list[str], top_k: int = 10) -> list[SearchResults]:
+        """
+        Search and rerank many queries. The first stage runs as one batched
+        datastore call (one embedding request for all the queries).
+        """
+        candidates = top_k * self.candidate_multiplier
+        filters = [extract_query_filters(query) for query in queries]
+        all_results = self.datastore.search_many(queries, top_k=candidates, filters=filters)
+
+        reranked = []
+        for query, query_filters, search_results in zip(queries, filters, all_results):
+            if query_filters and not len(search_results):
+                print(f"⚠️ No results for filters {query_filters}, searching everything.")
+                search_results = self.datastore.search_results(query, top_k=candidates)
+            reranked.append(self._rerank(query, search_results, top_k=top_k))
+        return reranked
+
     def _rerank(
-        self, query: str, search_results: list[str], top_k: int = 10
-    ) -> list[str]:
-        load_dotenv()
-        co_api_key=os.getenv("CO_API_KEY")
-        co = cohere.ClientV2(co_api_key)
-        time.sleep(6)
-        for attempt in range(5):  # hasta 5 reintentos
-            try:
-                time.sleep(10)  # evita pasarte del límite
-                response = co.rerank(
-                    model="rerank-multilingual-v3.5",
-                    query=query,
-                    documents=search_results,
-                    top_n=top_k,
-                )
-                break
-            except TooManyRequestsError:
-                wait = 10 * (attempt + 1)
-                print(f"⚠️ Límite de Cohere alcanzado. Reintentando en {wait}s...")
-                time.sleep(wait)
-        else:
-            raise RuntimeError("Demasiados intentos fallidos con Cohere")
+        self, query: str, search_results: SearchResults, top_k: int = 10
+    ) -> SearchResults:
+        if not len(search_results):
+            return search_results
+
+        # El limitador espera solo lo que exige la cuota (RAG_RATE_LIMIT_COHERE_RPM)
+        # y reintenta los 429 respetando Retry-After.
+        response = get_rate_limiter("cohere").call(
+            self.cohere_client.rerank,
+            model="rerank-multilingual-v3.5",
+            query=query,
+            documents=search_results.contents(),
+            top_n=top_k,
+        )
 
         result_indices = [result.index for result in response.results]
         print(f"✅ Reranked Indices: {result_indices}")
-        return [search_results[i] for i in result_indices]
\ No newline at end of file
+        reranked = search_results.take(result_indices).table
+        return SearchResults.from_columns(
+            reranked.column("content"),
+            reranked.column("source"),
+            distances=reranked.column("distance"),
+            scores=[result.relevance_score for result in response.results],
+        )
\ No newline at end of file
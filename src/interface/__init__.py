@@ -1,12 +1,25 @@
-from .base_datastore import BaseDatastore, DataItem
+from .base_async_datastore import BaseAsyncDatastore
+from .base_datastore import (
+    BaseDatastore,
+    DataItem,
+    SearchHit,
+    SearchResults,
+    document_of,
+)
+from .base_embedder import BaseEmbedder
 from .base_evaluator import BaseEvaluator, EvaluationResult
 from .base_indexer import BaseIndexer
 from .base_response_generator import BaseResponseGenerator
 from .base_retriever import BaseRetriever
 
 __all__ = [
+    "BaseAsyncDatastore",
     "BaseDatastore",
     "DataItem",
+    "SearchHit",
+    "SearchResults",
+    "document_of",
+    "BaseEmbedder",
     "BaseEvaluator",
     "EvaluationResult",
     "BaseIndexer",
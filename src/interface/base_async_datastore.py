@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from src.interface.base_datastore import DataItem
+
+
+class BaseAsyncDatastore(ABC):
+    """Async counterpart of BaseDatastore, for driving many queries from one event loop."""
+
+    @abstractmethod
+    async def aadd_items(self, items: List[DataItem]) -> None:
+        pass
+
+    @abstractmethod
+    async def aget_vector(self, content: str) -> List[float]:
+        pass
+
+    @abstractmethod
+    async def asearch(self, query: str, top_k: int = 5) -> List[str]:
+        pass
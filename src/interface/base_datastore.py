@@ -1,22 +1,206 @@
 from abc import ABC, abstractmethod
-from typing import List
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+)
+import pyarrow as pa
 from pydantic import BaseModel
 
 
 class DataItem(BaseModel):
     content: str = ""
     source: str = ""
+    issuer: str = ""
+    period: str = ""  # Fiscal quarter, e.g. "3Q25".
+    doc_type: str = ""
+    page: Optional[int] = None
+
+
+def document_of(source: str) -> str:
+    """Document a chunk comes from: sources are `filename:chunk_index`."""
+    return source.rsplit(":", 1)[0]
+
+
+def stale_documents(
+    stored_sources: Iterable[str],
+    sources_by_document: Dict[str, Iterable[str]],
+    keep_documents: Optional[Iterable[str]] = None,
+) -> Dict[str, Optional[Set[str]]]:
+    """
+    Documents that have stale rows, mapped to the sources to keep
+    (None: the whole document is gone). See BaseDatastore.sync_documents.
+    """
+    current = {document: set(sources) for document, sources in sources_by_document.items()}
+    keep = None if keep_documents is None else set(keep_documents) | set(current)
+    if keep is not None and not keep:
+        raise ValueError("Refusing to delete every document: no documents to keep.")
+    stale: Dict[str, Optional[Set[str]]] = {}
+    for source in stored_sources:
+        document = document_of(source)
+        if document in current:
+            if source not in current[document]:
+                stale[document] = current[document]
+        elif keep is not None and document not in keep:
+            stale[document] = None
+    return stale
+
+
+class SearchHit(NamedTuple):
+    content: str
+    source: str
+    distance: Optional[float]
+    score: Optional[float]
+
+
+class SearchResults:
+    """
+    Arrow-backed search results with `content`, `source`, `distance` and
+    `score` columns (score: higher is better). Rows are only converted to
+    Python objects when they are accessed.
+    """
+
+    SCHEMA = pa.schema(
+        [
+            pa.field("content", pa.utf8()),
+            pa.field("source", pa.utf8()),
+            pa.field("distance", pa.float32()),
+            pa.field("score", pa.float32()),
+        ]
+    )
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+
+    @classmethod
+    def from_columns(
+        cls,
+        contents: Any,
+        sources: Any,
+        distances: Optional[Any] = None,
+        scores: Optional[Any] = None,
+    ) -> "SearchResults":
+        """Build results from Arrow arrays (or Python sequences)."""
+        size = len(contents)
+        arrays = []
+        for column, field in zip((contents, sources, distances, scores), cls.SCHEMA):
+            if column is None:
+                arrays.append(pa.nulls(size, field.type))
+            elif isinstance(column, (pa.Array, pa.ChunkedArray)):
+                arrays.append(column.cast(field.type))
+            else:
+                arrays.append(pa.array(column, type=field.type))
+        return cls(pa.Table.from_arrays(arrays, schema=cls.SCHEMA))
+
+    @classmethod
+    def empty(cls) -> "SearchResults":
+        return cls(cls.SCHEMA.empty_table())
+
+    @classmethod
+    def merge(cls, results: Sequence["SearchResults"], top_k: int) -> "SearchResults":
+        """Merge results from several searches, keeping the `top_k` best scores."""
+        if not results:
+            return cls.empty()
+        merged = pa.concat_tables([result.table for result in results])
+        return cls(merged.sort_by([("score", "descending")]).slice(0, top_k))
+
+    def contents(self) -> List[str]:
+        return self.table.column("content").to_pylist()
+
+    def sources(self) -> List[str]:
+        return self.table.column("source").to_pylist()
+
+    def distances(self) -> List[Optional[float]]:
+        return self.table.column("distance").to_pylist()
+
+    def scores(self) -> List[Optional[float]]:
+        return self.table.column("score").to_pylist()
+
+    def take(self, indices: Sequence[int]) -> "SearchResults":
+        return SearchResults(self.table.take(list(indices)))
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, i: int) -> SearchHit:
+        row = [self.table.column(name)[i].as_py() for name in self.SCHEMA.names]
+        return SearchHit(*row)
+
+    def __iter__(self) -> Iterator[SearchHit]:
+        for i in range(len(self)):
+            yield self[i]
 
 
 class BaseDatastore(ABC):
     @abstractmethod
-    def add_items(self, items: List[DataItem]) -> None:
+    def add_items(self, items: List[DataItem], update_indexes: bool = True) -> None:
         pass
 
+    def update_indexes(self) -> None:
+        """
+        Build or refresh search indexes after a write. `add_items` calls it
+        unless `update_indexes=False`; stores without indexes do nothing.
+        """
+
     @abstractmethod
     def get_vector(self, content: str) -> List[float]:
         pass
 
     @abstractmethod
-    def search(self, query: str, top_k: int = 5) -> List[str]:
-        pass
\ No newline at end of file
+    def search(
+        self, query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        pass
+
+    def search_results(
+        self, query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> SearchResults:
+        """Search returning content, source and score columns. Override to fill them in."""
+        contents = self.search(query, top_k=top_k, filters=filters)
+        return SearchResults.from_columns(contents, [None] * len(contents))
+
+    def search_many(
+        self, queries: List[str], top_k: int = 5, filters: Optional[Any] = None
+    ) -> List[SearchResults]:
+        """Search several queries. Override to batch the embeddings and scans."""
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * len(queries)
+        return [
+            self.search_results(query, top_k=top_k, filters=query_filters)
+            for query, query_filters in zip(queries, filters)
+        ]
+
+    def sync_documents(
+        self,
+        sources_by_document: Dict[str, Iterable[str]],
+        keep_documents: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Delete stale chunks: rows of the given documents whose source is not
+        in the current list (e.g. trailing chunks of a shorter re-issue) and,
+        when `keep_documents` is given, every document not in it or in
+        `sources_by_document`. Returns the number of deleted rows.
+        Datastores that don't support deleting rows keep everything (returns 0).
+        """
+        return 0
+
+    def add_item_stream(self, items: Iterable[DataItem], batch_size: int = 512) -> int:
+        """
+        Add items from an iterable in fixed-size batches, so memory stays flat
+        no matter how large the corpus is. Indexes are updated once, after the
+        last batch. Returns the number of items consumed.
+        """
+        iterator = iter(items)
+        total = 0
+        while batch := list(islice(iterator, batch_size)):
+            self.add_items(batch, update_indexes=False)
+            total += len(batch)
+        self.update_indexes()
+        return total
\ No newline at end of file
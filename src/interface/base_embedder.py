@@ -0,0 +1,21 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class BaseEmbedder(ABC):
+    """Base interface for embedding providers."""
+
+    model_name: str
+    dimensions: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        pass
+
+    def embed_one(self, text: str) -> List[float]:
+        return self.embed([text])[0]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of `embed`. Providers with a native async client should override it."""
+        return await asyncio.to_thread(self.embed, texts)
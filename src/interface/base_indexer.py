@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 from src.interface.base_datastore import DataItem
 
@@ -8,4 +8,9 @@ class BaseIndexer(ABC):
 
     @abstractmethod
     def index(self, document_paths: List[str]) -> List[DataItem]:
-        pass
\ No newline at end of file
+        pass
+
+    def iter_documents(self, document_paths: List[str]) -> Iterator[List[DataItem]]:
+        """Yield the items of one document at a time. Override to avoid buffering the corpus."""
+        for document_path in document_paths:
+            yield self.index([document_path])
\ No newline at end of file
@@ -1,9 +1,20 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+from src.interface.base_datastore import SearchResults
+
 
 class BaseRetriever(ABC):
 
     @abstractmethod
     def search(self, query: str, top_k: int = 5) -> List[str]:
-        pass
\ No newline at end of file
+        pass
+
+    def search_results(self, query: str, top_k: int = 5) -> SearchResults:
+        """Search returning content, source and score columns. Override to fill them in."""
+        contents = self.search(query, top_k=top_k)
+        return SearchResults.from_columns(contents, [None] * len(contents))
+
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[SearchResults]:
+        """Search several queries. Override to batch the work."""
+        return [self.search_results(query, top_k=top_k) for query in queries]
\ No newline at end of file
@@ -78,10 +78,11 @@
 
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 import re
 import json
-import time
+import os
 from src.interface import (
     BaseDatastore,
     BaseIndexer,
@@ -89,7 +90,10 @@ from src.interface import (
     BaseResponseGenerator,
     BaseEvaluator,
     EvaluationResult,
+    SearchResults,
+    document_of,
 )
+from src.util.dedup import NearDuplicateFilter
 
 # ======================================================
 # 🧱 Helper Functions
@@ -149,6 +153,7 @@ class RAGPipeline:
     retriever: BaseRetriever
     response_generator: BaseResponseGenerator
     evaluator: Optional[BaseEvaluator] = None
+    deduplicator: Optional[NearDuplicateFilter] = None
 
     # ---------------------------------------------
     # Core Functions
@@ -157,19 +162,87 @@ class RAGPipeline:
         """Reset the datastore."""
         self.datastore.reset()
 
-    def add_documents(self, documents: List[str]) -> None:
-        """Index a list of documents."""
-        items = self.indexer.index(documents)
-        self.datastore.add_items(items)
-        print(f"✅ Added {len(items)} items to the datastore.")
+    def rebuild_index(self) -> Optional[float]:
+        """Rebuild the datastore's vector index. Returns the build time in seconds."""
+        return self.datastore.build_index(force=True)
 
-    def process_query(self, query: str) -> str:
-        """Run the full RAG retrieval + generation pipeline."""
-        search_results = self.retriever.search(query)
+    def maintain(self, retention_days: float = 7) -> Dict[str, Any]:
+        """
+        Compact the datastore and prune versions older than `retention_days`,
+        printing the before/after storage stats.
+        """
+        report = self.datastore.maintain(retention=timedelta(days=retention_days))
+        before, after = report["before"], report["after"]
+        print(f"{'':>13} {'before':>12} {'after':>12}")
+        for key in ("files_on_disk", "rows_per_file", "versions", "bytes", "scan_ms"):
+            print(f"{key:>13} {before[key]:>12} {after[key]:>12}")
+        return report
+
+    def add_documents(
+        self, documents: List[str], batch_size: int = 512, remove_missing: bool = False
+    ) -> None:
+        """
+        Index a list of documents, streaming items from the indexer to the
+        datastore in fixed-size batches so peak memory stays flat.
+        Afterwards, chunks of these documents that were not produced again
+        are deleted; with `remove_missing`, so are documents not in the list.
+        """
+        if remove_missing and not documents:
+            # An empty list (e.g. a typo'd path) would mark every stored document as removed.
+            raise ValueError("Refusing to sync with an empty document list.")
+        items = (
+            item
+            for document_items in self.indexer.iter_documents(documents)
+            for item in document_items
+        )
+        if self.deduplicator is not None:
+            items = self.deduplicator.iter_unique(items)
+
+        sources_by_document: Dict[str, List[str]] = {}
+
+        def track(items):
+            for item in items:
+                sources_by_document.setdefault(document_of(item.source), []).append(item.source)
+                yield item
+
+        count = self.datastore.add_item_stream(track(items), batch_size=batch_size)
+        print(f"✅ Added {count} items to the datastore.")
+        if self.deduplicator is not None:
+            self._report_dedup()
+
+        if remove_missing and not sources_by_document:
+            print("⚠️ No document could be indexed; skipping removal of missing documents.")
+            return
+        keep_documents = [os.path.basename(path) for path in documents] if remove_missing else None
+        self.datastore.sync_documents(sources_by_document, keep_documents)
+
+    def _report_dedup(self) -> None:
+        """Print how many near-duplicate chunks were dropped and what that saved."""
+        stats = self.deduplicator.stats()
+        if not stats["dropped"]:
+            return
+        price = float(os.getenv("RAG_EMBEDDING_PRICE_PER_MTOK", "0.02"))
+        dimensions = getattr(self.datastore, "vector_dimensions", 0)
+        bytes_per_value = 2 if getattr(self.datastore, "vector_dtype", "") == "float16" else 4
+        vector_bytes = stats["dropped"] * dimensions * bytes_per_value
+        print(
+            f"🧬 Dropped {stats['dropped']}/{stats['seen']} near-duplicate chunks: "
+            f"~{stats['tokens_saved']} embedding tokens (~${stats['tokens_saved'] * price / 1e6:.4f}) "
+            f"and ~{(vector_bytes + stats['content_bytes_saved']) / 1e6:.2f} MB of index saved."
+        )
+
+    def process_query(self, query: str, results: Optional[SearchResults] = None) -> str:
+        """
+        Run the full RAG retrieval + generation pipeline.
+        `results` can carry already retrieved context (e.g. from search_many).
+        """
+        if results is None:
+            results = self.retriever.search_results(query)
+        search_results = results.contents()
         print(f"✅ Found {len(search_results)} results for query: {query}\n")
 
-        for i, result in enumerate(search_results):
-            print(f"🔍 Result {i+1}: {result[:500]}...\n")
+        for i, hit in enumerate(results):
+            print(f"🔍 Result {i+1} [{hit.source} | score={hit.score}]: {hit.content[:500]}...\n")
 
         # Generar respuesta base
         response = self.response_generator.generate_response(query, search_results)
@@ -191,9 +264,12 @@ class RAGPipeline:
         print(f"🧠 Starting evaluation with {len(questions)} questions...")
         results: List[EvaluationResult] = []
 
-        for q, expected in zip(questions, expected_answers):
-            time.sleep(6)  # evitar rate limit (Cohere u OpenAI)
-            r = self._evaluate_single_question(q, expected)
+        # Recupera el contexto de todas las preguntas en un solo lote.
+        retrieved = self.retriever.search_many(questions)
+
+        # Las llamadas a Cohere/OpenAI pasan por el rate limiter compartido.
+        for q, expected, context in zip(questions, expected_answers, retrieved):
+            r = self._evaluate_single_question(q, expected, context)
             results.append(r)
 
         # Mostrar resultados uno por uno
@@ -215,8 +291,10 @@ class RAGPipeline:
         print(f"✨ Total Score: {metrics['accuracy']*100:.1f}% Accuracy")
         return results
 
-    def _evaluate_single_question(self, question: str, expected_answer: str) -> EvaluationResult:
+    def _evaluate_single_question(
+        self, question: str, expected_answer: str, context: Optional[SearchResults] = None
+    ) -> EvaluationResult:
         """Evalúa una pregunta individual."""
-        response = self.process_query(question)
+        response = self.process_query(question, context)
         result = self.evaluator.evaluate(question, response, expected_answer)
         return result
@@ -0,0 +1,153 @@
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+import numpy as np
+
+# OpenAI embedding models reject inputs longer than this.
+MAX_INPUT_TOKENS = 8191
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for OpenAI tokenizers)."""
+    return max(1, len(text) // 4)
+
+
+def tokenizer_counter(tokenizer: Any) -> Callable[[str], int]:
+    """
+    Token counter backed by a chunker tokenizer (docling's BaseTokenizer or a
+    Hugging Face tokenizer), falling back to `estimate_tokens`.
+    """
+    if hasattr(tokenizer, "count_tokens"):
+        return tokenizer.count_tokens
+    if hasattr(tokenizer, "tokenize"):
+        return lambda text: len(tokenizer.tokenize(text))
+    return estimate_tokens
+
+
+def pack_batches(
+    texts: Sequence[str],
+    max_items: int,
+    max_tokens: int,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    token_counts: Optional[Sequence[int]] = None,
+) -> List[List[int]]:
+    """
+    Group texts into as few batches as possible, bounded by item count and
+    tokens (first-fit decreasing: long texts first, short ones fill the gaps).
+    Returns the indices of the texts in each batch.
+    """
+    if token_counts is None:
+        token_counts = [count_tokens(text) for text in texts]
+
+    batches: List[List[int]] = []
+    batch_tokens: List[int] = []
+    for i in sorted(range(len(texts)), key=lambda i: token_counts[i], reverse=True):
+        tokens = token_counts[i]
+        for b, batch in enumerate(batches):
+            if len(batch) < max_items and batch_tokens[b] + tokens <= max_tokens:
+                batch.append(i)
+                batch_tokens[b] += tokens
+                break
+        else:
+            batches.append([i])
+            batch_tokens.append(tokens)
+    return batches
+
+
+def split_text(
+    text: str, max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens
+) -> List[str]:
+    """Split `text` at whitespace into pieces of at most `max_tokens` tokens."""
+    if count_tokens(text) <= max_tokens or len(text) < 2:
+        return [text]
+    middle = len(text) // 2
+    cut = text.rfind(" ", 0, middle)
+    if cut <= 0:
+        cut = middle
+    return split_text(text[:cut], max_tokens, count_tokens) + split_text(
+        text[cut:], max_tokens, count_tokens
+    )
+
+
+def truncate_text(
+    text: str, max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens
+) -> str:
+    """Longest prefix of `text` with at most `max_tokens` tokens."""
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+class EmbeddingPlan(NamedTuple):
+    pieces: List[str]  # Texts actually sent to the embedder.
+    owners: List[int]  # Index of the original text each piece belongs to.
+    weights: List[int]  # Tokens per piece.
+    batches: List[List[int]]  # Indices into `pieces`.
+
+
+def plan_embedding_batches(
+    texts: Sequence[str],
+    max_items: int,
+    max_tokens: int,
+    max_input_tokens: int = MAX_INPUT_TOKENS,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    oversize: str = "split",
+) -> EmbeddingPlan:
+    """
+    Prepare texts for batched embedding. Texts over `max_input_tokens` are
+    split into pieces (embedded separately and averaged back, see
+    `combine_pieces`) or truncated, with a warning. Pieces are then packed
+    into the fewest batches that respect `max_items` and `max_tokens`.
+    """
+    pieces: List[str] = []
+    owners: List[int] = []
+    weights: List[int] = []
+    oversized = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if tokens <= max_input_tokens:
+            parts, part_tokens = [text], [tokens]
+        else:
+            oversized += 1
+            if oversize == "truncate":
+                parts = [truncate_text(text, max_input_tokens, count_tokens)]
+            else:
+                parts = split_text(text, max_input_tokens, count_tokens)
+            part_tokens = [count_tokens(part) for part in parts]
+        pieces.extend(parts)
+        owners.extend([i] * len(parts))
+        weights.extend(part_tokens)
+
+    if oversized:
+        action = "truncated" if oversize == "truncate" else "split"
+        print(f"⚠️ {oversized} text(s) over {max_input_tokens} tokens were {action} for embedding.")
+
+    batches = pack_batches(pieces, max_items, max_tokens, token_counts=weights)
+    return EmbeddingPlan(pieces, owners, weights, batches)
+
+
+def combine_pieces(
+    plan: EmbeddingPlan, piece_vectors: Sequence[List[float]], count: int
+) -> List[List[float]]:
+    """One vector per original text: the token-weighted, normalised mean of its pieces."""
+    if len(plan.pieces) == count:
+        return list(piece_vectors)
+    grouped: List[List[int]] = [[] for _ in range(count)]
+    for piece, owner in enumerate(plan.owners):
+        grouped[owner].append(piece)
+
+    vectors = []
+    for pieces in grouped:
+        if len(pieces) == 1:
+            vectors.append(list(piece_vectors[pieces[0]]))
+            continue
+        mean = np.average(
+            np.asarray([piece_vectors[p] for p in pieces], dtype=np.float32),
+            axis=0,
+            weights=[plan.weights[p] for p in pieces],
+        )
+        vectors.append((mean / max(float(np.linalg.norm(mean)), 1e-12)).tolist())
+    return vectors
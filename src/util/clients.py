@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict
+
+# openai and httpx are imported when the first client is built, which keeps
+# them out of the startup path of commands that never call the API.
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+
+class ConnectionMetrics:
+    """Counts HTTP requests and newly opened connections, to measure connection reuse."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def on_request(self, request: "httpx.Request") -> None:
+        # httpcore reports connection events through the "trace" extension.
+        request.extensions["trace"] = self._trace
+
+    async def aon_request(self, request: "httpx.Request") -> None:
+        request.extensions["trace"] = self._atrace
+
+    def on_response(self, response: "httpx.Response") -> None:
+        with self._lock:
+            self.requests += 1
+
+    async def aon_response(self, response: "httpx.Response") -> None:
+        self.on_response(response)
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    async def _atrace(self, event_name: str, info: dict) -> None:
+        self._trace(event_name, info)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            requests, opened = self.requests, self.connections_opened
+        reused = max(0, requests - opened)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_rate": round(reused / requests, 3) if requests else 0.0,
+        }
+
+
+metrics = ConnectionMetrics()
+
+_lock = threading.Lock()
+_openai_client = None
+# Async clients hold connections bound to an event loop, so keep one per loop.
+_async_openai_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _http_settings() -> dict:
+    """Connection pool and timeout settings, configurable through env vars."""
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=int(os.getenv("RAG_HTTP_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(os.getenv("RAG_HTTP_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(os.getenv("RAG_HTTP_KEEPALIVE_EXPIRY", 60)),
+        ),
+        "timeout": httpx.Timeout(
+            float(os.getenv("RAG_HTTP_TIMEOUT", 60)),
+            connect=float(os.getenv("RAG_HTTP_CONNECT_TIMEOUT", 10)),
+        ),
+    }
+
+
+def get_openai_client() -> "OpenAI":
+    """Process-wide OpenAI client, shared so TLS connections are reused across calls."""
+    global _openai_client
+    with _lock:
+        if _openai_client is None:
+            from openai import DefaultHttpxClient, OpenAI
+
+            settings = _http_settings()
+            http_client = DefaultHttpxClient(
+                **settings,
+                event_hooks={
+                    "request": [metrics.on_request],
+                    "response": [metrics.on_response],
+                },
+            )
+            _openai_client = OpenAI(http_client=http_client, timeout=settings["timeout"])
+        return _openai_client
+
+
+def get_async_openai_client() -> "AsyncOpenAI":
+    """AsyncOpenAI client shared by everything running on the current event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_openai_clients.get(loop)
+        if client is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            settings = _http_settings()
+            http_client = DefaultAsyncHttpxClient(
+                **settings,
+                event_hooks={
+                    "request": [metrics.aon_request],
+                    "response": [metrics.aon_response],
+                },
+            )
+            client = AsyncOpenAI(http_client=http_client, timeout=settings["timeout"])
+            _async_openai_clients[loop] = client
+        return client
+
+
+def connection_stats() -> Dict[str, float]:
+    return metrics.stats()
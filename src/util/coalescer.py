@@ -0,0 +1,143 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class EmbeddingCoalescer:
+    """
+    Micro-batching for concurrent single-text embedding calls. Callers
+    `submit` one text and get a Future; a background thread collects the
+    texts that arrive within `max_wait_ms` of the first one (up to
+    `max_batch_size`) and sends them as a single batched request, resolving
+    every caller's future with its own vector.
+    """
+
+    _instances: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _instances_lock = threading.Lock()
+    _STOP = object()
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+        max_inflight_batches: int = 4,
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_inflight_batches = max_inflight_batches
+        self.requests = 0
+        self.batches = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    @classmethod
+    def for_embedder(cls, embedder) -> "EmbeddingCoalescer":
+        """One coalescer per embedder, so every datastore using it shares the batches."""
+        with cls._instances_lock:
+            coalescer = cls._instances.get(embedder)
+            if coalescer is None:
+                # Only a weak reference to the embedder: a strong one in the
+                # value would keep the key, and this coalescer's threads, alive.
+                embed = weakref.WeakMethod(embedder.embed)
+                coalescer = cls(
+                    lambda texts: embed()(texts),
+                    max_wait_ms=float(os.getenv("RAG_EMBED_COALESCE_MS", "5")),
+                )
+                cls._instances[embedder] = coalescer
+                weakref.finalize(embedder, coalescer.close)
+            return coalescer
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        if self._closed:
+            raise RuntimeError("EmbeddingCoalescer is closed")
+        self._ensure_started()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> List[float]:
+        if self.max_wait <= 0:
+            return self.embed_batch([text])[0]
+        return self.submit(text).result()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            requests, batches = self.requests, self.batches
+        return {
+            "requests": requests,
+            "batches": batches,
+            "avg_batch_size": round(requests / batches, 2) if batches else 0.0,
+        }
+
+    def close(self) -> None:
+        """Stop the background thread once the queued texts are sent."""
+        with self._lock:
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(self._STOP)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_inflight_batches,
+                    thread_name_prefix="embedding-coalescer",
+                )
+                self._thread = threading.Thread(
+                    target=self._collect, name="embedding-coalescer", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self) -> None:
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is self._STOP:
+                break
+            batch = [request]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is self._STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+            # Send it from the pool so the next batch can be collected meanwhile.
+            self._executor.submit(self._dispatch, batch)
+        self._executor.shutdown(wait=False)
+
+    def _dispatch(self, batch: Sequence[tuple]) -> None:
+        # Every future gets a result or an exception; an error raised here
+        # would be lost in the pool and leave the callers waiting forever.
+        try:
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            with self._lock:
+                self.requests += len(batch)
+                self.batches += 1
+            vectors = self.embed_batch(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"Embedder returned {len(vectors)} vectors for {len(texts)} texts"
+                )
+            by_text = dict(zip(texts, vectors))
+            for text, future in batch:
+                future.set_result(by_text[text])
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
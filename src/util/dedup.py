@@ -0,0 +1,119 @@
+import re
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from src.interface.base_datastore import DataItem
+from src.util.batching import estimate_tokens
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+", re.UNICODE)
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+class NearDuplicateFilter:
+    """
+    MinHash/LSH near-duplicate detection for chunks. Boilerplate (disclaimers,
+    legal notices, repeated tables) that shows up across many PDFs is kept
+    once: later copies are dropped before they are embedded and stored, and
+    `duplicates` records which kept chunk each dropped one collapsed into.
+
+    Chunks are compared as sets of word `shingle_size`-grams; two chunks are
+    duplicates when their estimated Jaccard similarity is >= `threshold` and
+    they contain the same figures, in the same order. A results table that
+    only differs from last quarter's in its numbers is new data, not a copy.
+    State is kept across calls, so it also works on a stream of batches.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a, b < 2**32 and 32-bit shingle hashes keep a * x + b inside uint64.
+        self._a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+
+        self._buckets: Dict[bytes, List[int]] = {}
+        self._signatures: List[np.ndarray] = []
+        self._kept_sources: List[str] = []
+        self._kept_numbers: List[tuple] = []
+        self.duplicates: Dict[str, str] = {}
+        self.seen = 0
+        self.tokens_saved = 0
+        self.bytes_saved = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.casefold())
+        n = self.shingle_size
+        shingles = (
+            {" ".join(words[i : i + n]) for i in range(len(words) - n + 1)}
+            if len(words) >= n
+            else {" ".join(words)}
+        )
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def find_duplicate(self, item: DataItem) -> Optional[str]:
+        """Source of an already kept near-duplicate of `item`, or None (then `item` is kept)."""
+        signature = self.signature(item.content)
+        rows = self.rows_per_band
+        band_keys = [
+            band.to_bytes(2, "big") + signature[band * rows : (band + 1) * rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+        numbers = tuple(_NUMBER.findall(item.content))
+        candidates = {i for key in band_keys for i in self._buckets.get(key, ())}
+        for i in sorted(candidates):
+            if self._kept_numbers[i] != numbers:
+                continue
+            similarity = float(np.mean(self._signatures[i] == signature))
+            if similarity >= self.threshold:
+                return self._kept_sources[i]
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        self._kept_sources.append(item.source)
+        self._kept_numbers.append(numbers)
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(index)
+        return None
+
+    def iter_unique(self, items: Iterable[DataItem]) -> Iterator[DataItem]:
+        """Yield the items that are not near-duplicates of an earlier one."""
+        for item in items:
+            self.seen += 1
+            duplicate_of = self.find_duplicate(item)
+            if duplicate_of is None:
+                yield item
+                continue
+            self.duplicates[item.source] = duplicate_of
+            self.tokens_saved += estimate_tokens(item.content)
+            self.bytes_saved += len(item.content.encode("utf-8"))
+
+    def filter(self, items: List[DataItem]) -> List[DataItem]:
+        return list(self.iter_unique(items))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "seen": self.seen,
+            "dropped": len(self.duplicates),
+            "tokens_saved": self.tokens_saved,
+            "content_bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,214 @@
+import asyncio
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+from src.interface.base_embedder import BaseEmbedder
+from src.util.batching import (
+    MAX_INPUT_TOKENS,
+    EmbeddingPlan,
+    combine_pieces,
+    estimate_tokens,
+    plan_embedding_batches,
+)
+from src.util.coalescer import EmbeddingCoalescer
+from src.util.embedding_cache import EmbeddingCache
+from src.util.lru_cache import LRUCache
+
+
+def normalize_query(query: str) -> str:
+    """Normalise query text so trivially different spellings share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", query).casefold().split())
+
+
+class EmbeddingMixin:
+    """
+    The embedding side of a datastore, shared by every backend: embedding
+    cache first, then cache misses packed into token-aware batches (long
+    texts split and averaged back), and search queries through an
+    in-memory query cache. Call `_init_embeddings` from `__init__`.
+    """
+
+    def _init_embeddings(
+        self,
+        embedder: BaseEmbedder,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        query_cache: Optional[LRUCache] = None,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 24 * 3600,
+        embedding_batch_size: int = 256,
+        embedding_batch_max_tokens: int = 100_000,
+        embedding_max_input_tokens: int = MAX_INPUT_TOKENS,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        embedding_oversize: str = "split",
+        max_inflight_batches: int = 4,
+    ) -> None:
+        self.embedder = embedder
+        self.vector_dimensions = embedder.dimensions
+        # Opened on first use, like the table, so building a pipeline does
+        # not create data/ or open SQLite.
+        self._embedding_cache = embedding_cache
+        self._embedding_cache_lock = threading.Lock()
+        # Repeated questions skip the embedding round-trip entirely.
+        self.query_cache = query_cache or LRUCache(
+            query_cache_size, ttl_seconds=query_cache_ttl
+        )
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_max_tokens = embedding_batch_max_tokens
+        # Token counts for packing document batches; pass the chunker's
+        # tokenizer (Indexer.count_tokens) to fill each request as much as
+        # possible. Queries are always packed with the cheap estimate, so
+        # searching never loads the tokenizer.
+        self.embedding_max_input_tokens = embedding_max_input_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+        self.embedding_oversize = embedding_oversize  # "split" or "truncate"
+        self.max_inflight_batches = max_inflight_batches
+
+    @property
+    def embedding_cache(self) -> EmbeddingCache:
+        if self._embedding_cache is None:
+            with self._embedding_cache_lock:
+                if self._embedding_cache is None:
+                    self._embedding_cache = EmbeddingCache()
+        return self._embedding_cache
+
+    # ---------------------------------------------
+    # Sync
+    # ---------------------------------------------
+    def get_vector(self, content: str) -> List[float]:
+        model = self.embedder.model_name
+        cached = self.embedding_cache.get(model, self.vector_dimensions, content)
+        if cached is not None:
+            return cached
+        # Concurrent callers are coalesced into one batched request.
+        vector = EmbeddingCoalescer.for_embedder(self.embedder).embed(content)
+        self.embedding_cache.put(model, self.vector_dimensions, content, vector)
+        return vector
+
+    def get_query_vector(self, query: str) -> List[float]:
+        """Embed a search query, going through the in-memory query cache first."""
+        key = normalize_query(query)
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = self.get_vector(query)
+            self.query_cache.put(key, vector)
+        return vector
+
+    def get_query_vectors(self, queries: List[str]) -> List[List[float]]:
+        """Embed many search queries; the ones not in the query cache go out in one batched call."""
+        keys = [normalize_query(query) for query in queries]
+        vectors = [self.query_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = self.get_vectors(
+                [queries[i] for i in missing], count_tokens=estimate_tokens
+            )
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+                self.query_cache.put(keys[i], vector)
+        return vectors
+
+    def get_vectors(
+        self, contents: List[str], count_tokens: Optional[Callable[[str], int]] = None
+    ) -> List[List[float]]:
+        """
+        Embed many texts, packing cache misses into batched requests.
+        Vectors are returned in the same order as `contents`. `count_tokens`
+        overrides the datastore's token counter for this call.
+        """
+        model = self.embedder.model_name
+        vectors = self.embedding_cache.get_many(model, self.vector_dimensions, contents)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        missing_texts = [contents[i] for i in missing]
+        plan = self._plan_embeddings(missing_texts, count_tokens)
+        # Send batches in parallel (since it's network bound).
+        with ThreadPoolExecutor(max_workers=self.max_inflight_batches) as executor:
+            batch_vectors = list(
+                executor.map(
+                    lambda batch: self.embedder.embed([plan.pieces[i] for i in batch]),
+                    plan.batches,
+                )
+            )
+        self._fill_missing(vectors, missing, plan, batch_vectors)
+        self.embedding_cache.put_many(
+            model, self.vector_dimensions, missing_texts, [vectors[i] for i in missing]
+        )
+        return vectors
+
+    # ---------------------------------------------
+    # Async
+    # ---------------------------------------------
+    async def aget_vector(self, content: str) -> List[float]:
+        return (await self.aget_vectors([content]))[0]
+
+    async def aget_query_vector(self, query: str) -> List[float]:
+        key = normalize_query(query)
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = (await self.aget_vectors([query], count_tokens=estimate_tokens))[0]
+            self.query_cache.put(key, vector)
+        return vector
+
+    async def aget_vectors(
+        self, contents: List[str], count_tokens: Optional[Callable[[str], int]] = None
+    ) -> List[List[float]]:
+        """Embed many texts, sending cache misses as concurrent batched requests."""
+        model = self.embedder.model_name
+        vectors = await asyncio.to_thread(
+            self.embedding_cache.get_many, model, self.vector_dimensions, contents
+        )
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        missing_texts = [contents[i] for i in missing]
+        plan = self._plan_embeddings(missing_texts, count_tokens)
+        inflight = asyncio.Semaphore(self.max_inflight_batches)
+
+        async def embed_batch(batch: List[int]) -> List[List[float]]:
+            async with inflight:
+                return await self.embedder.aembed([plan.pieces[i] for i in batch])
+
+        batch_vectors = await asyncio.gather(*(embed_batch(b) for b in plan.batches))
+        self._fill_missing(vectors, missing, plan, batch_vectors)
+        await asyncio.to_thread(
+            self.embedding_cache.put_many,
+            model,
+            self.vector_dimensions,
+            missing_texts,
+            [vectors[i] for i in missing],
+        )
+        return vectors
+
+    # ---------------------------------------------
+    # Helpers
+    # ---------------------------------------------
+    def _plan_embeddings(
+        self, texts: List[str], count_tokens: Optional[Callable[[str], int]] = None
+    ) -> EmbeddingPlan:
+        return plan_embedding_batches(
+            texts,
+            max_items=self.embedding_batch_size,
+            max_tokens=self.embedding_batch_max_tokens,
+            max_input_tokens=self.embedding_max_input_tokens,
+            count_tokens=count_tokens or self.count_tokens,
+            oversize=self.embedding_oversize,
+        )
+
+    @staticmethod
+    def _fill_missing(
+        vectors: List[Optional[List[float]]],
+        missing: List[int],
+        plan: EmbeddingPlan,
+        batch_vectors: Sequence[List[List[float]]],
+    ) -> None:
+        """Put the embedded pieces back together, in the slots of the cache misses."""
+        piece_vectors: List[Optional[List[float]]] = [None] * len(plan.pieces)
+        for batch, embeddings in zip(plan.batches, batch_vectors):
+            for i, embedding in zip(batch, embeddings):
+                piece_vectors[i] = embedding
+        for i, vector in zip(missing, combine_pieces(plan, piece_vectors, len(missing))):
+            vectors[i] = vector
@@ -1,6 +1,8 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+from src.util.batching import estimate_tokens
+from src.util.clients import get_openai_client
+from src.util.rate_limit import get_rate_limiter
 
 def invoke_ai(system_message: str, user_message: str) -> str:
     """
@@ -8,8 +10,10 @@ def invoke_ai(system_message: str, user_message: str) -> str:
     Replace this if you want to use a different AI model.
     """
 
-    client = OpenAI()  # Insert the API key here, or use env variable $OPENAI_API_KEY.
-    response = client.chat.completions.create(
+    client = get_openai_client()  # Uses the env variable $OPENAI_API_KEY.
+    response = get_rate_limiter("openai").call(
+        client.chat.completions.create,
+        tokens=estimate_tokens(system_message) + estimate_tokens(user_message),
         model="o4-mini",
         messages=[
             {"role": "system", "content": system_message},
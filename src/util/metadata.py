@@ -0,0 +1,167 @@
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+# BYMA issuers we expect to see in filenames and questions.
+KNOWN_ISSUERS = (
+    "YPF",
+    "Loma Negra",
+    "Pampa Energía",
+    "Grupo Financiero Galicia",
+    "Banco Macro",
+    "BBVA Argentina",
+    "Telecom Argentina",
+    "Transportadora de Gas del Sur",
+    "Central Puerto",
+    "Ternium Argentina",
+    "Aluar",
+    "Cresud",
+    "IRSA",
+    "Mirgor",
+    "Vista Energy",
+    "Tenaris",
+)
+
+_ORDINALS = {
+    "primer": 1,
+    "primero": 1,
+    "segundo": 2,
+    "tercer": 3,
+    "tercero": 3,
+    "cuarto": 4,
+    "first": 1,
+    "second": 2,
+    "third": 3,
+    "fourth": 4,
+}
+
+# Each pattern captures (quarter, year) or (year, quarter); see extract_period.
+_PERIOD_PATTERNS = [
+    (re.compile(r"\b([1-4])\s*[QT]\s*'?(\d{2}|\d{4})\b", re.IGNORECASE), "qy"),
+    (
+        re.compile(
+            r"\b[QT]\s*([1-4])(?:\s*[-_ ]\s*|\s+(?:de|del|of)\s+)?(\d{4}|\d{2})\b",
+            re.IGNORECASE,
+        ),
+        "qy",
+    ),
+    (re.compile(r"\b(\d{4})\s*[-_ ]\s*[QT]\s*([1-4])\b", re.IGNORECASE), "yq"),
+    (
+        re.compile(
+            r"\b(primer|primero|segundo|tercer|tercero|cuarto|first|second|third|fourth)"
+            r"\s+(?:trimestre|quarter)(?:\s+(?:de|del|of))?(?:\s+(?:a[nñ]o))?\s+(\d{4})\b",
+            re.IGNORECASE,
+        ),
+        "oy",
+    ),
+]
+
+# Words that make a period a point of comparison rather than the subject,
+# e.g. "¿Cuánto creció el EBITDA frente al 3T24?".
+_COMPARISON = re.compile(
+    r"\b(frente|vs|versus|contra|respecto|compar\w*|interanual|desde|hasta|"
+    r"anterior|previo|since|against|compared)\b",
+    re.IGNORECASE,
+)
+
+_DOC_TYPES = (
+    ("aviso de pago", "aviso_de_pago"),
+    ("estados financieros", "estados_financieros"),
+    ("memoria", "memoria"),
+    ("hecho relevante", "hecho_relevante"),
+)
+
+_FILENAME_NOISE = re.compile(r"\b(ESP|ENG|SPA|EN|ES|FINAL|v\d+)\b", re.IGNORECASE)
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents, for forgiving comparisons."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _normalize_period(match: "re.Match", order: str) -> str:
+    first, second = match.group(1), match.group(2)
+    if order == "yq":
+        year, quarter = first, second
+    elif order == "oy":
+        quarter, year = str(_ORDINALS[first.lower()]), second
+    else:
+        quarter, year = first, second
+    return f"{quarter}Q{year[-2:]}"
+
+
+def extract_period(text: str) -> str:
+    """Find a fiscal quarter in `text` and normalise it to e.g. "3Q25"."""
+    for pattern, order in _PERIOD_PATTERNS:
+        match = pattern.search(text.replace("_", " "))
+        if match:
+            return _normalize_period(match, order)
+    return ""
+
+
+def extract_periods(text: str) -> List[str]:
+    """Every distinct fiscal quarter mentioned in `text`, in order of appearance."""
+    text = text.replace("_", " ")
+    found = [
+        (match.start(), _normalize_period(match, order))
+        for pattern, order in _PERIOD_PATTERNS
+        for match in pattern.finditer(text)
+    ]
+    return list(dict.fromkeys(period for _, period in sorted(found)))
+
+
+def extract_issuer(text: str, issuers: Iterable[str] = KNOWN_ISSUERS) -> str:
+    folded = _fold(text)
+    for issuer in issuers:
+        if re.search(rf"\b{re.escape(_fold(issuer))}\b", folded):
+            return issuer
+    return ""
+
+
+def extract_doc_type(text: str, period: str = "") -> str:
+    folded = _fold(text)
+    for needle, doc_type in _DOC_TYPES:
+        if needle in folded:
+            return doc_type
+    return "reporte_trimestral" if period else "otro"
+
+
+def extract_document_metadata(filename: str, text: str = "") -> Dict[str, str]:
+    """
+    Derive issuer, period and document type from a filename, falling back to
+    a sample of the document text (e.g. its first chunks).
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0].rstrip(".")
+    period = extract_period(stem) or extract_period(text)
+    doc_type = extract_doc_type(stem, period)
+    if doc_type == "otro" and text:
+        doc_type = extract_doc_type(text, period)
+
+    issuer = extract_issuer(stem) or extract_issuer(text)
+    if not issuer and doc_type in ("reporte_trimestral", "otro"):
+        # Unknown issuer: use whatever is left of the filename, e.g. "Acme - 3Q25 - ESP".
+        cleaned = re.split(r"[-_]|\b\d|\b[QT][1-4]\b", stem)[0]
+        issuer = _FILENAME_NOISE.sub("", cleaned).strip(" .")
+
+    return {"issuer": issuer, "period": period, "doc_type": doc_type}
+
+
+def extract_query_filters(
+    query: str, issuers: Iterable[str] = KNOWN_ISSUERS
+) -> Optional[Dict[str, str]]:
+    """
+    Infer metadata filters from a question: the issuer it names, and the
+    period only when it is the subject. Several periods, or one used as a
+    point of comparison ("frente al 3T24"), mean the answer may need other
+    quarters too, so the period is left unfiltered.
+    """
+    filters = {}
+    issuer = extract_issuer(query, issuers)
+    if issuer:
+        filters["issuer"] = issuer
+    periods = extract_periods(query)
+    if len(periods) == 1 and not _COMPARISON.search(_fold(query)):
+        filters["period"] = periods[0]
+    return filters or None
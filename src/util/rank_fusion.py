@@ -0,0 +1,16 @@
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]], k: int = 60
+) -> List[Tuple[Hashable, float]]:
+    """
+    Merge several ranked lists with reciprocal-rank fusion:
+    score(d) = sum over lists of 1 / (k + rank(d)), with ranks starting at 1.
+    Returns (key, score) pairs sorted from best to worst.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,169 @@
+import asyncio
+import email.utils
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Requests and tokens per minute for each provider; override them with
+# RAG_RATE_LIMIT_<PROVIDER>_RPM / RAG_RATE_LIMIT_<PROVIDER>_TPM.
+# Cohere's default matches a trial key (10 rerank calls per minute).
+DEFAULT_LIMITS: Dict[str, tuple] = {
+    "openai": (3000, 1_000_000),
+    "cohere": (10, None),
+}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` units and refills at
+    `rate_per_second`. `reserve` always takes the units (the level may go
+    negative) and returns how long the caller has to wait before using them,
+    so concurrent callers queue up in arrival order without busy waiting.
+    """
+
+    def __init__(self, capacity: float, rate_per_second: float):
+        self.capacity = capacity
+        self.rate_per_second = rate_per_second
+        self.level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self.level = min(self.capacity, self.level + elapsed * self.rate_per_second)
+            self._updated = now
+            self.level -= amount
+            if self.level >= 0:
+                return 0.0
+            return -self.level / self.rate_per_second
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and (optionally) tokens-per-minute limits for one
+    provider. Every call to the provider goes through `call`/`acall`, which
+    wait just as long as the quota requires. A 429 pauses every caller for the
+    Retry-After the provider sent (or an exponential backoff) and retries.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+            if tokens_per_minute
+            else None
+        )
+        self.max_retries = max_retries
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Take one request (and `tokens`) from the buckets; returns the seconds to wait."""
+        delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        with self._lock:
+            paused = self._paused_until - time.monotonic()
+        return max(delay, paused, 0.0)
+
+    def acquire(self, tokens: int = 0) -> None:
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def call(self, fn: Callable, *args: Any, tokens: int = 0, **kwargs: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self._backoff(e, attempt)
+
+    async def acall(self, fn: Callable, *args: Any, tokens: int = 0, **kwargs: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(tokens)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self._backoff(e, attempt)
+
+    def _backoff(self, error: Exception, attempt: int) -> None:
+        wait = retry_after_seconds(error)
+        if wait is None:
+            wait = min(60.0, 2.0**attempt)
+        print(f"⚠️ Límite de {self.provider} alcanzado. Reintentando en {wait:.1f}s...")
+        self.pause(wait)
+
+
+def _headers(error: Exception) -> Dict[str, str]:
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    return {k.lower(): v for k, v in dict(headers or {}).items()}
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ in ("RateLimitError", "TooManyRequestsError")
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds to wait according to the Retry-After(-ms) headers of a 429, if any."""
+    headers = _headers(error)
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        date = email.utils.parsedate_to_datetime(value)
+        return max(0.0, date.timestamp() - time.time()) if date else None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Process-wide limiter for `provider`, shared by every call site."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            default_rpm, default_tpm = DEFAULT_LIMITS.get(provider, (60, None))
+            prefix = f"RAG_RATE_LIMIT_{provider.upper()}"
+            rpm = float(os.getenv(f"{prefix}_RPM", default_rpm))
+            tpm = os.getenv(f"{prefix}_TPM", default_tpm)
+            _limiters[provider] = RateLimiter(
+                provider, rpm, float(tpm) if tpm else None
+            )
+        return _limiters[provider]
@@ -0,0 +1,41 @@
+from typing import Any, Dict, Iterable, Optional
+
+
+def sql_literal(value) -> str:
+    """Render a Python value as a SQL literal for LanceDB `where` filters."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_in(column: str, values: Iterable) -> str:
+    """Build a `column IN (...)` predicate."""
+    return f"{column} IN ({', '.join(sql_literal(v) for v in values)})"
+
+
+def sql_prefix(column: str, prefix: str) -> str:
+    """
+    Build a "column starts with prefix" predicate. Uses left() rather than
+    starts_with/LIKE, which treat `_` in filenames as a wildcard.
+    """
+    return f"left({column}, {len(prefix)}) = {sql_literal(prefix)}"
+
+
+def sql_filter(filters: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Turn {column: value} filters into a SQL predicate. List values become
+    `IN (...)`; all conditions are combined with AND.
+    """
+    if not filters:
+        return None
+    conditions = []
+    for column, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            conditions.append(sql_in(column, value))
+        else:
+            conditions.append(f"{column} = {sql_literal(value)}")
+    return " AND ".join(conditions)
@@ -0,0 +1,50 @@
+import asyncio
+import lancedb
+import pyarrow as pa
+import pytest
+from src.impl.async_datastore import AsyncDatastore
+from src.impl.embedder import LocalHashEmbedder
+from src.interface.base_datastore import DataItem
+from src.util.embedding_cache import EmbeddingCache
+
+
+def legacy_table(db_path, dimensions=64):
+    """A rag-table from before content hashes, metadata columns and the model record."""
+    schema = pa.schema(
+        [
+            pa.field("vector", pa.list_(pa.float32(), dimensions)),
+            pa.field("content", pa.utf8()),
+            pa.field("source", pa.utf8()),
+        ]
+    )
+    table = lancedb.connect(db_path).create_table("rag-table", schema=schema)
+    table.add([{"vector": [0.1] * dimensions, "content": "viejo", "source": "a.pdf:0"}])
+
+
+def datastore(tmp_path, dimensions=64):
+    return AsyncDatastore(
+        embedder=LocalHashEmbedder(dimensions=dimensions),
+        embedding_cache=EmbeddingCache(str(tmp_path / "cache.sqlite")),
+        db_path=str(tmp_path / "lancedb"),
+    )
+
+
+def test_legacy_table_is_migrated_before_adding(tmp_path):
+    legacy_table(str(tmp_path / "lancedb"))
+    store = datastore(tmp_path)
+
+    async def add():
+        await store.aadd_items([DataItem(content="nuevo", source="a.pdf:1")])
+        table = await store.get_table()
+        return await table.schema(), await table.count_rows()
+
+    schema, rows = asyncio.run(add())
+    assert "content_hash" in schema.names and "issuer" in schema.names
+    assert schema.field("vector").metadata[b"embedding_model"] == b"local-hash-ngram-3-4-5"
+    assert rows == 2
+
+
+def test_other_vector_dimensions_raise_on_open(tmp_path):
+    legacy_table(str(tmp_path / "lancedb"), dimensions=32)
+    with pytest.raises(ValueError, match="32-dim"):
+        asyncio.run(datastore(tmp_path).get_table())
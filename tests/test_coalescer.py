@@ -0,0 +1,39 @@
+import gc
+import weakref
+import pytest
+from src.util.coalescer import EmbeddingCoalescer
+
+
+class FakeEmbedder:
+    def embed(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+def test_short_batch_fails_every_future():
+    coalescer = EmbeddingCoalescer(lambda texts: [[0.0]] * (len(texts) - 1), max_wait_ms=50)
+    futures = [coalescer.submit(text) for text in ("a", "b", "c")]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+
+
+def test_embedder_errors_reach_the_callers():
+    def fail(texts):
+        raise RuntimeError("rate limited")
+
+    with pytest.raises(RuntimeError, match="rate limited"):
+        EmbeddingCoalescer(fail).submit("a").result(timeout=5)
+
+
+def test_coalescer_does_not_keep_its_embedder_alive():
+    embedder = FakeEmbedder()
+    coalescer = EmbeddingCoalescer.for_embedder(embedder)
+    assert coalescer.embed("abc") == [3.0]
+    thread = coalescer._thread
+    alive = weakref.ref(embedder)
+
+    del embedder
+    gc.collect()
+    assert alive() is None
+    thread.join(timeout=5)
+    assert not thread.is_alive()
@@ -0,0 +1,36 @@
+from src.interface.base_datastore import DataItem
+from src.util.dedup import NearDuplicateFilter
+
+DISCLAIMER = (
+    "Este documento contiene declaraciones sobre el futuro que están sujetas a "
+    "riesgos e incertidumbres. Los resultados reales pueden diferir materialmente "
+    "de los expresados en estas declaraciones, y la compañía no asume obligación "
+    "de actualizarlas salvo que la normativa aplicable lo requiera."
+)
+
+
+def results_table(ebitda: str) -> str:
+    rows = [f"Línea {i} | Ingresos | {1000 + i * 17},5 | {900 + i * 13},2" for i in range(35)]
+    return "\n".join(rows + [f"EBITDA ajustado | {ebitda} | 1.302,4"])
+
+
+def test_tables_that_differ_only_in_figures_are_kept():
+    dedup = NearDuplicateFilter()
+    items = [
+        DataItem(content=results_table("1.290,1"), source="YPF 2Q25.pdf:3"),
+        DataItem(content=results_table("1.415,7"), source="YPF 3Q25.pdf:3"),
+    ]
+    assert dedup.filter(items) == items
+    assert dedup.duplicates == {}
+
+
+def test_repeated_boilerplate_is_dropped():
+    dedup = NearDuplicateFilter()
+    kept = dedup.filter(
+        [
+            DataItem(content=DISCLAIMER, source="YPF 2Q25.pdf:40"),
+            DataItem(content=DISCLAIMER, source="Loma Negra 2Q25.pdf:31"),
+        ]
+    )
+    assert [item.source for item in kept] == ["YPF 2Q25.pdf:40"]
+    assert dedup.duplicates == {"Loma Negra 2Q25.pdf:31": "YPF 2Q25.pdf:40"}
@@ -0,0 +1,28 @@
+from src.impl.embedder import LocalHashEmbedder
+from src.util.embedding_cache import EmbeddingCache
+from src.util.embedding_mixin import EmbeddingMixin
+
+
+class Store(EmbeddingMixin):
+    def __init__(self, cache_path, count_tokens):
+        self._init_embeddings(
+            LocalHashEmbedder(dimensions=64),
+            embedding_cache=EmbeddingCache(cache_path),
+            count_tokens=count_tokens,
+        )
+
+
+def test_query_embedding_does_not_use_the_document_tokenizer(tmp_path):
+    def tokenizer(text):
+        raise AssertionError("the chunker tokenizer was loaded for a query")
+
+    store = Store(str(tmp_path / "cache.sqlite"), tokenizer)
+    vectors = store.get_query_vectors(["EBITDA de YPF", "deuda neta de Pampa"])
+    assert [len(vector) for vector in vectors] == [64, 64]
+
+
+def test_documents_are_packed_with_the_given_counter(tmp_path):
+    counted = []
+    store = Store(str(tmp_path / "cache.sqlite"), lambda text: counted.append(text) or 1)
+    store.get_vectors(["chunk uno", "chunk dos"])
+    assert sorted(counted) == ["chunk dos", "chunk uno"]
@@ -0,0 +1,21 @@
+from src.impl.datastore import Datastore
+from src.impl.embedder import LocalHashEmbedder
+from src.interface.base_datastore import DataItem
+from src.util.embedding_cache import EmbeddingCache
+
+
+def test_streamed_ingest_updates_indexes_once(tmp_path, monkeypatch):
+    datastore = Datastore(
+        embedder=LocalHashEmbedder(dimensions=64),
+        embedding_cache=EmbeddingCache(str(tmp_path / "cache.sqlite")),
+        db_path=str(tmp_path / "lancedb"),
+    )
+    calls = []
+    update_indexes = datastore.update_indexes
+    monkeypatch.setattr(datastore, "update_indexes", lambda: calls.append(1) or update_indexes())
+
+    items = (DataItem(content=f"chunk {i}", source=f"a.pdf:{i}") for i in range(150))
+    assert datastore.add_item_stream(items, batch_size=40) == 150
+    assert calls == [1]
+    assert datastore.table.count_rows() == 150
+    assert any(index.name == "content_idx" for index in datastore.table.list_indices())
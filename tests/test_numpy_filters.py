@@ -0,0 +1,25 @@
+import pyarrow as pa
+from src.impl.numpy_datastore import NumpyDatastore
+
+
+ITEMS = pa.table({"issuer": ["YPF", "Loma Negra", "YPF"], "period": ["3Q25", "3Q25", "2Q25"]})
+
+
+def test_filter_key_accepts_sets():
+    key = NumpyDatastore._filter_key({"issuer": {"YPF", "Loma Negra"}})
+    assert key == NumpyDatastore._filter_key({"issuer": ["Loma Negra", "YPF"]})
+
+
+def test_filter_key_matches_scalars_and_single_item_lists():
+    assert NumpyDatastore._filter_key({"issuer": "YPF"}) == NumpyDatastore._filter_key(
+        {"issuer": ("YPF",)}
+    )
+
+
+def test_filter_key_of_no_filters():
+    assert NumpyDatastore._filter_key(None) == NumpyDatastore._filter_key({})
+
+
+def test_filter_rows_with_set_values():
+    rows = NumpyDatastore._filter_rows(ITEMS, {"issuer": {"YPF"}, "period": ["3Q25"]})
+    assert rows.tolist() == [0]
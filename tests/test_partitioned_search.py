@@ -0,0 +1,61 @@
+import pytest
+from src.impl.datastore import Datastore
+from src.impl.embedder import LocalHashEmbedder
+from src.impl.partitioned_datastore import PartitionedDatastore
+from src.interface.base_datastore import DataItem
+from src.util.embedding_cache import EmbeddingCache
+
+CEMENT = [
+    "Loma Negra: EBITDA ajustado consolidado del segmento cemento de {} millones",
+    "Despachos de cemento de Loma Negra y EBITDA ajustado consolidado, {} toneladas",
+    "Margen de EBITDA ajustado consolidado en cemento, hormigón y cal: {}%",
+]
+OIL = [
+    "YPF: EBITDA ajustado consolidado de upstream y Vaca Muerta de {} millones",
+    "EBITDA ajustado consolidado de YPF en refinación y petróleo: {} millones",
+]
+
+
+def items():
+    chunks = []
+    for issuer, templates in (("Loma Negra", CEMENT), ("YPF", OIL)):
+        for i in range(6):
+            chunks.append(
+                DataItem(
+                    content=templates[i % len(templates)].format(100 + i),
+                    source=f"{issuer}:{i}",
+                    issuer=issuer,
+                )
+            )
+    return chunks
+
+
+@pytest.fixture
+def stores(tmp_path):
+    embedder = LocalHashEmbedder(dimensions=256)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    single = Datastore(embedder=embedder, embedding_cache=cache, db_path=str(tmp_path / "single"))
+    partitioned = PartitionedDatastore(
+        embedder=embedder, embedding_cache=cache, db_path=str(tmp_path / "partitioned")
+    )
+    for store in (single, partitioned):
+        store.add_items(items())
+    return single, partitioned
+
+
+def issuers(results):
+    return [source.split(":")[0] for source in results.sources()]
+
+
+def test_hybrid_fan_out_ranks_like_a_single_table(stores):
+    single, partitioned = stores
+    query = "EBITDA ajustado consolidado cemento"
+    expected = single.search_results(query, top_k=8, mode="hybrid")
+    assert issuers(expected) == ["Loma Negra"] * 6 + ["YPF"] * 2
+
+    # BM25 statistics are per shard, so ties inside an issuer may swap.
+    fanned_out = partitioned.search_results(query, top_k=8, mode="hybrid")
+    [many] = partitioned.search_many([query], top_k=8, mode="hybrid")
+    for results in (fanned_out, many):
+        assert issuers(results) == issuers(expected)
+        assert set(results.sources()) == set(expected.sources())
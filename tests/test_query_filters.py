@@ -0,0 +1,19 @@
+from src.util.metadata import extract_periods, extract_query_filters
+
+
+def test_single_period_is_filtered():
+    filters = extract_query_filters("¿Cuál fue el EBITDA de YPF en el 3T25?")
+    assert filters == {"issuer": "YPF", "period": "3Q25"}
+
+
+def test_comparison_period_is_not_filtered():
+    assert extract_query_filters("¿Cuánto creció el EBITDA frente al 3T24?") is None
+
+
+def test_several_periods_keep_only_the_issuer():
+    filters = extract_query_filters("Ventas de Pampa Energía en 2Q25 y 3Q25")
+    assert filters == {"issuer": "Pampa Energía"}
+
+
+def test_extract_periods_in_order():
+    assert extract_periods("3T25 vs tercer trimestre de 2024, y 3Q25") == ["3Q25", "3Q24"]
@@ -0,0 +1,85 @@
+import pytest
+from src.interface.base_datastore import BaseDatastore, document_of, stale_documents
+from src.rag_pipeline import RAGPipeline
+from src.util.sql import sql_prefix
+
+
+STORED = ["a.pdf:0", "a.pdf:1", "a.pdf:2", "b.pdf:0", "c_1.pdf:0"]
+
+
+def test_document_of_keeps_colons_in_filenames():
+    assert document_of("informe:3T25.pdf:4") == "informe:3T25.pdf"
+
+
+def test_shorter_reissue_drops_trailing_chunks():
+    stale = stale_documents(STORED, {"a.pdf": ["a.pdf:0", "a.pdf:1"]})
+    assert stale == {"a.pdf": {"a.pdf:0", "a.pdf:1"}}
+
+
+def test_unchanged_documents_are_not_stale():
+    stale = stale_documents(STORED, {"a.pdf": ["a.pdf:0", "a.pdf:1", "a.pdf:2"]})
+    assert stale == {}
+
+
+def test_without_keep_documents_other_documents_survive():
+    assert "b.pdf" not in stale_documents(STORED, {"a.pdf": ["a.pdf:0"]})
+
+
+def test_keep_documents_removes_missing_ones():
+    stale = stale_documents(
+        STORED, {"a.pdf": ["a.pdf:0", "a.pdf:1", "a.pdf:2"]}, keep_documents=["a.pdf", "c_1.pdf"]
+    )
+    assert stale == {"b.pdf": None}
+
+
+def test_empty_keep_documents_is_refused():
+    with pytest.raises(ValueError):
+        stale_documents(STORED, {}, keep_documents=[])
+
+
+def test_sql_prefix_does_not_use_wildcards():
+    assert sql_prefix("source", "c_1.pdf:") == "left(source, 8) = 'c_1.pdf:'"
+
+
+def test_sql_prefix_escapes_quotes():
+    assert sql_prefix("source", "o'neil.pdf:") == "left(source, 11) = 'o''neil.pdf:'"
+
+
+class ListDatastore(BaseDatastore):
+    """Minimal datastore without sync support."""
+
+    def __init__(self):
+        self.items = []
+
+    def add_items(self, items, update_indexes=True):
+        self.items.extend(items)
+
+    def get_vector(self, content):
+        return [0.0]
+
+    def search(self, query, top_k=5, filters=None):
+        return []
+
+
+class NoDocumentsIndexer:
+    def iter_documents(self, document_paths):
+        return iter([])
+
+
+def test_base_sync_documents_is_a_no_op():
+    assert ListDatastore().sync_documents({"a.pdf": ["a.pdf:0"]}, ["a.pdf"]) == 0
+
+
+def test_sync_refuses_an_empty_document_list():
+    pipeline = RAGPipeline(ListDatastore(), NoDocumentsIndexer(), None, None)
+    with pytest.raises(ValueError):
+        pipeline.add_documents([], remove_missing=True)
+
+
+def test_sync_skips_removal_when_nothing_was_indexed():
+    class RecordingDatastore(ListDatastore):
+        def sync_documents(self, sources_by_document, keep_documents=None):
+            raise AssertionError("sync_documents should not be called")
+
+    pipeline = RAGPipeline(RecordingDatastore(), NoDocumentsIndexer(), None, None)
+    pipeline.add_documents(["sample_data/sourc/a.pdf"], remove_missing=True)